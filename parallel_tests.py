@@ -0,0 +1,189 @@
+"""
+Параллельный запуск тестов YaNews и YaNote.
+
+Тесты каждого проекта собираются через pytest --collect-only и делятся
+на шарды, шарды обоих проектов запускаются одновременно отдельными
+процессами pytest. Тестовая база SQLite у каждого процесса своя, в
+памяти, поэтому шарды не мешают друг другу. Итоги шардов читаются из
+отчётов JUnit XML и сводятся в одну таблицу.
+
+Запуск: python parallel_tests.py [--workers N]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from collections import namedtuple
+from pathlib import Path
+from time import perf_counter, sleep
+from xml.etree import ElementTree
+
+BASE_DIR = Path(__file__).resolve().parent
+POLL_INTERVAL = 0.05
+
+Project = namedtuple('Project', ('name', 'path', 'settings'))
+Shard = namedtuple('Shard', ('project', 'number', 'tests'))
+Result = namedtuple(
+    'Result', ('shard', 'status', 'elapsed', 'counts', 'failed', 'log')
+)
+
+PROJECTS = (
+    Project('YaNews', BASE_DIR / 'ya_news', 'yanews.settings'),
+    Project('YaNote', BASE_DIR / 'ya_note', 'yanote.settings'),
+)
+
+
+def pytest_command(*args):
+    return [sys.executable, '-m', 'pytest', *args]
+
+
+def project_env(project):
+    env = dict(os.environ)
+    env['DJANGO_SETTINGS_MODULE'] = project.settings
+    return env
+
+
+def collect(project):
+    """Id тестов проекта с учётом отбора из pytest.ini."""
+    result = subprocess.run(
+        pytest_command('--collect-only', '-qqq'),
+        cwd=project.path,
+        env=project_env(project),
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode:
+        sys.stderr.write(result.stdout + result.stderr)
+        sys.exit(result.returncode)
+    return [line for line in result.stdout.splitlines() if '::' in line]
+
+
+def split(tests, workers):
+    """
+    Делит тесты на шарды примерно поровну.
+
+    Тесты одного класса unittest остаются в одном шарде, чтобы
+    setUpTestData выполнялся один раз. Самые большие группы
+    распределяются первыми в наименее загруженный шард.
+    """
+    groups = {}
+    for test in tests:
+        parts = test.split('::')
+        key = '::'.join(parts[:2]) if len(parts) > 2 else test
+        groups.setdefault(key, []).append(test)
+    shards = [[] for _ in range(workers)]
+    for group in sorted(groups.values(), key=len, reverse=True):
+        min(shards, key=len).extend(group)
+    return [shard for shard in shards if shard]
+
+
+def read_report(path):
+    """
+    Число упавших и пропущенных тестов и упавшие тесты из отчёта
+    JUnit XML. Подтесты pytest-subtests считаются отдельно.
+    """
+    counts = dict.fromkeys(('failures', 'errors', 'skipped'), 0)
+    failed = []
+    try:
+        root = ElementTree.parse(path).getroot()
+    except (OSError, ElementTree.ParseError):
+        return counts, failed
+    for suite in root.iter('testsuite'):
+        for key in counts:
+            counts[key] += int(suite.get(key, 0))
+    for case in root.iter('testcase'):
+        if case.find('failure') is not None or case.find('error') is not None:
+            failed.append(f'{case.get("classname")}::{case.get("name")}')
+    return counts, failed
+
+
+def run(shards, directory):
+    """Запускает все шарды сразу и ждёт их, запоминая время каждого."""
+    running = {}
+    for shard in shards:
+        name = f'{shard.project.name}-{shard.number}'
+        report = directory / f'{name}.xml'
+        log = directory / f'{name}.log'
+        with open(log, 'w') as output:
+            process = subprocess.Popen(
+                pytest_command(
+                    '--tb=line', f'--junitxml={report}', *shard.tests
+                ),
+                cwd=shard.project.path,
+                env=project_env(shard.project),
+                stdout=output,
+                stderr=subprocess.STDOUT,
+            )
+        running[process] = (shard, report, log, perf_counter())
+    results = []
+    while running:
+        for process in [process for process in running if process.poll()
+                        is not None]:
+            shard, report, log, start = running.pop(process)
+            counts, failed = read_report(report)
+            results.append(Result(
+                shard, process.returncode, perf_counter() - start,
+                counts, failed, log.read_text()
+            ))
+        sleep(POLL_INTERVAL)
+    return sorted(results, key=lambda result: (
+        result.shard.project.name, result.shard.number
+    ))
+
+
+def report(results, wall_time):
+    """Печатает время шардов и общую сводку, возвращает код выхода."""
+    totals = dict.fromkeys(('failures', 'errors', 'skipped'), 0)
+    print('Шарды:')
+    for result in results:
+        for key in totals:
+            totals[key] += result.counts[key]
+        print(
+            f'  {result.shard.project.name} #{result.shard.number}: '
+            f'{len(result.shard.tests)} тестов, '
+            f'упало {result.counts["failures"] + result.counts["errors"]}, '
+            f'{result.elapsed:.1f} с'
+        )
+    failed = [result for result in results if result.status]
+    for result in failed:
+        print(f'\nВывод {result.shard.project.name} #{result.shard.number}:')
+        print(result.log)
+    tests = sum(len(result.shard.tests) for result in results)
+    shards_time = sum(result.elapsed for result in results)
+    print(
+        f'\nИтого: {tests} тестов, '
+        f'упало {totals["failures"] + totals["errors"]}, '
+        f'пропущено {totals["skipped"]}; '
+        f'{wall_time:.1f} с вместо {shards_time:.1f} с подряд'
+    )
+    for result in failed:
+        for test in result.failed:
+            print(f'  FAILED {result.shard.project.name}: {test}')
+    return max((result.status for result in results), default=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=max(1, (os.cpu_count() or 1) // len(PROJECTS)),
+        help='Число шардов каждого проекта.'
+    )
+    workers = max(1, parser.parse_args().workers)
+    start = perf_counter()
+    shards = [
+        Shard(project, number, tests)
+        for project in PROJECTS
+        for number, tests in enumerate(
+            split(collect(project), workers), start=1
+        )
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        results = run(shards, Path(directory))
+    return report(results, perf_counter() - start)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
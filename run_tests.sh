@@ -21,6 +21,19 @@ then
     echo $LF 1>&2
     if python structure_test.py
     then
+        if [[ "$1" == "--parallel" ]]
+        then
+            # Оба проекта одновременно, тесты каждого - в $2 процессах.
+            if python parallel_tests.py ${2:+--workers "$2"} 1>&2;
+            then
+                exit 0
+            else
+                status=$?
+                print_message " При параллельном запуске упали ваши тесты. Список упавших тестов - в конце сводки " "=" 1
+                echo \`\`\` 1>&2
+                exit $status
+            fi
+        fi
         cd ya_news
         export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:="yanews.settings"}"
         if pytest --tb=line 1>&2;
@@ -0,0 +1,28 @@
+"""
+Маршруты news с асинхронными главной и страницей новости.
+
+Подключаются через ROOT_URLCONF = 'yanews.async_urls' при запуске
+под ASGI, остальные страницы берутся из news.urls.
+"""
+from django.urls import path
+
+from news import async_views, urls as sync_urls
+from news.budgets import budget
+
+app_name = sync_urls.app_name
+
+ASYNC_PAGES = ('home', 'detail')
+
+urlpatterns = [
+    budget(
+        path('', async_views.news_list, name='home'),
+        queries=3, ms=200
+    ),
+    budget(
+        path('news/<int:pk>/', async_views.news_detail, name='detail'),
+        queries=4, ms=200
+    ),
+] + [
+    pattern for pattern in sync_urls.urlpatterns
+    if pattern.name not in ASYNC_PAGES
+]
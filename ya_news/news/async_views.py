@@ -0,0 +1,85 @@
+"""
+Асинхронные главная и страница новости, см. news.async_urls.
+
+В Django 3.2 нет асинхронного ORM, поэтому каждая страница делает
+всю работу с базой и кэшем за один переход sync_to_async. Такие
+переходы всех запросов выполняются в одном общем потоке, так что
+параллельной работы с базой по сравнению с WSGI они не дают:
+выигрыш только в меньшем числе переходов, чем у синхронного вида
+под ASGI, см. test_asgi_load.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotAllowed
+from django.template.loader import render_to_string
+
+from .cache import count_home_cache, get_home_page_key
+from .views import NewsDetail, NewsList
+
+news_detail_sync = NewsDetail.as_view()
+
+
+@sync_to_async
+def load_home(request):
+    """
+    Всё синхронное для главной за один переход в поток.
+
+    Пользователь, кэш главной и список новостей: шаблон затем
+    отрисовывается в цикле событий и к базе уже не обращается.
+    """
+    if request.user.is_authenticated or not settings.NEWS_HOME_CACHE_ENABLED:
+        return None, None, list(NewsList().get_queryset())
+    key = get_home_page_key()
+    content = cache.get(key)
+    if content is not None:
+        count_home_cache('hits')
+        return key, content, None
+    count_home_cache('misses')
+    return key, None, list(NewsList().get_queryset())
+
+
+@sync_to_async
+def render_detail(request, pk):
+    """
+    Страница новости целиком в потоке: фрагмент с комментариями
+    кэшируется в шаблоне и при промахе кэша читает их из базы.
+    """
+    view = NewsDetail()
+    view.setup(request, pk=pk)
+    view.object = view.get_object()
+    context = view.get_context_data(object=view.object)
+    return render_to_string(view.template_name, context, request)
+
+
+async def news_list(request):
+    """
+    Асинхронная версия NewsList.
+
+    Как и NewsList, отвечает только на GET и HEAD: require_GET
+    в Django 3.2 не умеет оборачивать асинхронные виды.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponseNotAllowed(('GET', 'HEAD'))
+    key, content, object_list = await load_home(request)
+    if content is None:
+        content = render_to_string(
+            NewsList.template_name, {'object_list': object_list}, request
+        )
+        if key is not None:
+            await sync_to_async(cache.set)(
+                key, content, settings.NEWS_HOME_CACHE_TIMEOUT
+            )
+    return HttpResponse(content)
+
+
+async def news_detail(request, pk):
+    """
+    Асинхронная версия NewsDetail.
+
+    Асинхронно читается только страница, комментарии и прочие методы
+    обрабатывает синхронная NewsDetail.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return await sync_to_async(news_detail_sync)(request, pk=pk)
+    return HttpResponse(await render_detail(request, pk))
@@ -0,0 +1,15 @@
+"""Бюджеты страниц YaNews, проверяются в pytest_tests/test_budgets.py."""
+from collections import namedtuple
+
+Budget = namedtuple('Budget', ('queries', 'ms'))
+
+
+def budget(pattern, queries, ms):
+    """
+    Бюджет страницы для тестов производительности.
+
+    queries - число SQL-запросов, ms - время ответа в миллисекундах
+    на большом наборе данных для авторизованного пользователя.
+    """
+    pattern.budget = Budget(queries, ms)
+    return pattern
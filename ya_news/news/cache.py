@@ -0,0 +1,73 @@
+from time import time_ns
+
+from django.core.cache import cache
+
+COMMENTS_VERSION_KEY = 'news:{pk}:comments_version'
+HOME_VERSION_KEY = 'news:home_version'
+HOME_PAGE_KEY = 'news:home:{version}'
+HOME_STATS_KEY = 'news:home_cache:{name}'
+HOME_STATS = ('hits', 'misses')
+COMMENT_HOURS_PRUNED_KEY = 'news:comment_hours_pruned:{hour}'
+
+
+def get_version(key):
+    """
+    Версия набора данных для ключей кэша.
+
+    Начальное значение берётся от текущего времени, чтобы после
+    вытеснения счётчика из кэша не вернуться к уже занятой версии.
+    """
+    return cache.get_or_set(key, time_ns, None)
+
+
+def bump_version(key):
+    """Делает недействительными записи, построенные на старой версии."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time_ns(), None)
+
+
+def get_comments_version(news_pk):
+    return get_version(COMMENTS_VERSION_KEY.format(pk=news_pk))
+
+
+def bump_comments_version(news_pk):
+    bump_version(COMMENTS_VERSION_KEY.format(pk=news_pk))
+
+
+def get_home_page_key():
+    return HOME_PAGE_KEY.format(version=get_version(HOME_VERSION_KEY))
+
+
+def bump_home_version():
+    bump_version(HOME_VERSION_KEY)
+
+
+def count_home_cache(name):
+    """Увеличивает счётчик попаданий или промахов кэша главной."""
+    key = HOME_STATS_KEY.format(name=name)
+    if not cache.add(key, 1, None):
+        cache.incr(key)
+
+
+def get_home_cache_stats():
+    values = cache.get_many(
+        [HOME_STATS_KEY.format(name=name) for name in HOME_STATS]
+    )
+    return {
+        name: values.get(HOME_STATS_KEY.format(name=name), 0)
+        for name in HOME_STATS
+    }
+
+
+def claim_comment_hours_pruning(hour):
+    """
+    True только для первого вызова с этим часом за час.
+
+    Старые часовые счётчики чистятся один раз на новый час, а не на
+    каждый новый счётчик.
+    """
+    return cache.add(
+        COMMENT_HOURS_PRUNED_KEY.format(hour=hour.isoformat()), True, 60 * 60
+    )
@@ -0,0 +1,188 @@
+from datetime import timedelta, timezone
+from threading import local
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, Greatest, TruncHour
+from django.utils import timezone as django_timezone
+
+from .cache import claim_comment_hours_pruning
+from .models import Comment, CommentHour, News
+
+
+class CascadeDeletion(local):
+    """
+    Новости и авторы, комментарии которых сейчас удаляются каскадом.
+
+    Удаление комментария их счётчики по одному не меняет: счётчики
+    новости удаляются вместе с ней, а комментарии автора вычитаются
+    заранее, см. uncount_author_comments и news.signals. Если удаление
+    упало, отметка остаётся до конца потока, и расхождение исправит
+    recount_comments.
+    """
+
+    def __init__(self):
+        self.news = set()
+        self.authors = set()
+
+    def covers(self, comment):
+        return (
+            comment.news_id in self.news or comment.author_id in self.authors
+        )
+
+
+cascade_deletion = CascadeDeletion()
+
+
+def get_hour(moment):
+    """Начало часа в UTC: ключ часового счётчика комментариев."""
+    return moment.astimezone(timezone.utc).replace(
+        minute=0, second=0, microsecond=0
+    )
+
+
+def window_start(hours):
+    """Первый час окна рейтинга из hours последних часов."""
+    return get_hour(django_timezone.now()) - timedelta(hours=hours - 1)
+
+
+def change_comment_count(comment, delta):
+    """
+    Меняет счётчик комментариев новости и её часовой счётчик.
+
+    Вызывается сигналами сохранения и удаления комментария, см.
+    news.signals. Оба счётчика меняются одним UPDATE без гонок, часовой
+    создаётся для первого комментария в часе; уже удалённый старый час
+    не восстанавливается. С первым счётчиком нового часа удаляются
+    счётчики старше самого длинного окна рейтинга. Счётчики
+    не опускаются ниже нуля: комментарии из bulk_create их не меняют,
+    пока их не пересчитает recount_comments.
+    """
+    News.objects.filter(pk=comment.news_id).update(
+        comment_count=Greatest(F('comment_count') + delta, 0)
+    )
+    key = {'news_id': comment.news_id, 'hour': get_hour(comment.created)}
+    hours = CommentHour.objects.filter(**key)
+    if hours.update(count=Greatest(F('count') + delta, 0)) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            CommentHour.objects.create(count=delta, **key)
+    except IntegrityError:
+        hours.update(count=F('count') + delta)
+    if claim_comment_hours_pruning(key['hour']):
+        prune_comment_hours()
+
+
+def prune_comment_hours():
+    """Удаляет часовые счётчики старше самого длинного окна рейтинга."""
+    since = window_start(max(settings.NEWS_RANKING_WINDOWS.values()))
+    return CommentHour.objects.filter(hour__lt=since).delete()[0]
+
+
+def uncount_author_comments(author_id):
+    """
+    Вычитает комментарии автора из счётчиков перед удалением автора.
+
+    Один UPDATE новостей и один UPDATE часовых счётчиков вместо
+    двух запросов на каждый удаляемый каскадом комментарий.
+    """
+    comments = Comment.objects.filter(author_id=author_id).order_by()
+    news_ids = comments.values('news')
+    News.objects.filter(pk__in=news_ids).update(comment_count=Greatest(
+        F('comment_count') - Coalesce(Subquery(
+            comments.filter(news=OuterRef('pk')).values('news').annotate(
+                count=Count('pk')
+            ).values('count')
+        ), 0),
+        0
+    ))
+    CommentHour.objects.filter(news__in=news_ids).update(count=Greatest(
+        F('count') - Coalesce(Subquery(
+            comments.annotate(
+                hour=TruncHour('created', tzinfo=timezone.utc)
+            ).filter(
+                news=OuterRef('news'), hour=OuterRef('hour')
+            ).values('news').annotate(count=Count('pk')).values('count')
+        ), 0),
+        0
+    ))
+
+
+def actual_comment_count():
+    """Число комментариев новости подзапросом по индексу комментариев."""
+    return Coalesce(Subquery(
+        Comment.objects.filter(
+            news=OuterRef('pk')
+        ).order_by().values('news').annotate(
+            count=Count('pk')
+        ).values('count')
+    ), 0)
+
+
+def rebuild_comment_hours(batch_size=1000):
+    """
+    Заново собирает часовые счётчики за самое длинное окно рейтинга.
+
+    Более старые счётчики при этом удаляются.
+    """
+    since = window_start(max(settings.NEWS_RANKING_WINDOWS.values()))
+    rows = Comment.objects.filter(created__gte=since).annotate(
+        hour=TruncHour('created', tzinfo=timezone.utc)
+    ).order_by().values_list('news', 'hour').annotate(count=Count('pk'))
+    with transaction.atomic():
+        CommentHour.objects.all().delete()
+        CommentHour.objects.bulk_create(
+            (CommentHour(news_id=news_id, hour=hour, count=count)
+             for news_id, hour, count in rows.iterator()),
+            batch_size=batch_size
+        )
+
+
+def recount_comments(batch_size=1000):
+    """
+    Пересчитывает comment_count всех новостей пачками по id.
+
+    Исправляет только расходящиеся счётчики и собирает заново часовые,
+    возвращает число проверенных и исправленных новостей.
+    """
+    last_id = checked = fixed = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                News.objects.filter(id__gt=last_id).order_by('id').annotate(
+                    actual=actual_comment_count()
+                ).values_list('id', 'comment_count', 'actual')[:batch_size]
+            )
+            if not rows:
+                break
+            wrong = [
+                News(pk=pk, comment_count=actual)
+                for pk, stored, actual in rows if stored != actual
+            ]
+            News.objects.bulk_update(wrong, ('comment_count',))
+        last_id = rows[-1][0]
+        checked += len(rows)
+        fixed += len(wrong)
+    rebuild_comment_hours(batch_size)
+    return checked, fixed
+
+
+def most_discussed(hours, count):
+    """
+    Самые обсуждаемые новости за hours последних часов.
+
+    Суммирует часовые счётчики, а не комментарии, поэтому окно
+    выровнено по часам. Каждой новости добавляется window_count.
+    """
+    ranking = CommentHour.objects.filter(
+        hour__gte=window_start(hours)
+    ).values_list('news').annotate(
+        total=Sum('count')
+    ).filter(total__gt=0).order_by('-total', '-news')[:count]
+    totals = dict(ranking)
+    news = News.objects.in_bulk(totals)
+    for news_id, total in totals.items():
+        news[news_id].window_count = total
+    return [news[news_id] for news_id in totals]
@@ -0,0 +1,171 @@
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from itertools import accumulate, islice
+from random import Random
+from secrets import token_hex
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .cache import bump_home_version
+from .counters import recount_comments
+from .models import Comment, News
+from .search import index_new_documents
+
+User = get_user_model()
+
+Dataset = namedtuple('Dataset', ('user_ids', 'news_ids'))
+
+TITLE_WORDS = (
+    'Учёные', 'Мэрия', 'Сборная', 'Жители', 'Блогеры', 'Студенты',
+    'открыли', 'запустили', 'обсудили', 'перенесли', 'выиграли', 'нашли',
+    'новый', 'первый', 'главный', 'необычный', 'городской', 'зимний',
+    'парк', 'турнир', 'фестиваль', 'проект', 'маршрут', 'музей', 'рекорд',
+)
+TEXT_SENTENCES = (
+    'Подробности пока не сообщаются.',
+    'Событие вызвало большой интерес у читателей.',
+    'Организаторы обещают продолжение.',
+    'Эксперты оценивают новость по-разному.',
+    'Мы будем следить за развитием событий.',
+)
+COMMENT_TEXTS = (
+    'Отличная новость!', 'А где подробности?', 'Давно пора.',
+    'Не верю.', 'Спасибо, интересно.', 'Было бы здорово посмотреть.',
+    'Согласен с предыдущим комментарием.', 'Ничего не понятно.',
+)
+
+
+def zipf_weights(count, exponent=1.0):
+    """Накопленные веса распределения Ципфа для random.choices."""
+    return list(accumulate(
+        1 / rank ** exponent for rank in range(1, count + 1)
+    ))
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    batch = list(islice(iterator, size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, size))
+
+
+@contextmanager
+def explicit_created():
+    """Позволяет сохранить заданное время комментария."""
+    field = Comment._meta.get_field('created')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def create_users(count, batch_size=5000):
+    """Создаёт пользователей с неиспользуемым паролем, возвращает их id."""
+    run = token_hex(4)
+    password = make_password(None)
+    for batch in batched(range(count), batch_size):
+        User.objects.bulk_create(
+            User(username=f'user-{run}-{index}', password=password)
+            for index in batch
+        )
+    return list(User.objects.filter(
+        username__startswith=f'user-{run}-'
+    ).values_list('id', flat=True))
+
+
+def create_news(random, count, days, batch_size):
+    """
+    Создаёт новости за последние days дней, возвращает {id: дата}.
+
+    Случайные повторы заголовка и текста пропускаются.
+    """
+    last_id = News.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+    today = timezone.localdate()
+    for batch in batched(range(count), batch_size):
+        news_list = []
+        for _ in batch:
+            title = ' '.join(
+                random.sample(TITLE_WORDS, 3)
+            ).capitalize()[:News._meta.get_field('title').max_length]
+            text = ' '.join(random.choices(TEXT_SENTENCES, k=4))
+            news_list.append(News(
+                title=title,
+                text=text,
+                date=today - timedelta(days=random.randrange(days)),
+                content_hash=News.get_content_hash(title, text),
+            ))
+        with transaction.atomic():
+            News.objects.bulk_create(news_list, ignore_conflicts=True)
+    return dict(News.objects.filter(id__gt=last_id).values_list('id', 'date'))
+
+
+def create_comments(random, count, news_dates, user_ids, batch_size):
+    """
+    Создаёт комментарии, возвращает id новостей по убыванию популярности.
+
+    Число комментариев у новости и у автора распределено по Ципфу,
+    время комментария - между датой новости и текущим моментом.
+    """
+    news_ids = list(news_dates)
+    random.shuffle(news_ids)
+    news_weights = zipf_weights(len(news_ids))
+    user_weights = zipf_weights(len(user_ids))
+    now = timezone.now()
+    starts = {
+        news_id: timezone.make_aware(datetime.combine(date, time.min))
+        for news_id, date in news_dates.items()
+    }
+    with explicit_created():
+        for batch in batched(range(count), batch_size):
+            comments = [
+                Comment(
+                    news_id=news_id,
+                    author_id=author_id,
+                    text=random.choice(COMMENT_TEXTS),
+                    created=(
+                        starts[news_id]
+                        + (now - starts[news_id]) * random.random()
+                    ),
+                )
+                for news_id, author_id in zip(
+                    random.choices(news_ids, cum_weights=news_weights,
+                                   k=len(batch)),
+                    random.choices(user_ids, cum_weights=user_weights,
+                                   k=len(batch))
+                )
+            ]
+            with transaction.atomic():
+                Comment.objects.bulk_create(comments)
+    return news_ids
+
+
+def generate_news_data(users, news, comments, days=365, seed=0,
+                       batch_size=5000):
+    """
+    Создаёт пользователей, новости и комментарии через bulk_create.
+
+    Заголовки и тексты на кириллице, у нескольких самых популярных
+    новостей большая часть комментариев. Счётчики комментариев
+    пересчитываются, а новые документы индексируются после вставки.
+    """
+    random = Random(seed)
+    last_ids = [
+        model.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+        for model in (News, Comment)
+    ]
+    user_ids = create_users(users, batch_size)
+    news_dates = create_news(random, news, days, batch_size)
+    news_ids = create_comments(
+        random, comments, news_dates, user_ids, batch_size
+    )
+    recount_comments(batch_size)
+    index_new_documents(*last_ids, batch_size=batch_size)
+    bump_home_version()
+    return Dataset(user_ids, news_ids)
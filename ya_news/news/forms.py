@@ -1,7 +1,13 @@
-from django.forms import ModelForm
+from functools import lru_cache
+
+from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.forms import ModelForm
 
 from .models import Comment
+from .profanity import WordMatcher, read_words
 
 BAD_WORDS = (
     'редиска',
@@ -11,6 +17,25 @@ BAD_WORDS = (
 WARNING = 'Не ругайтесь!'
 
 
+@lru_cache(maxsize=None)
+def get_bad_words_matcher():
+    """
+    Автомат для BAD_WORDS и слов из файла BAD_WORDS_FILE.
+
+    Строится один раз на процесс.
+    """
+    words = list(BAD_WORDS)
+    if settings.BAD_WORDS_FILE:
+        words += read_words(settings.BAD_WORDS_FILE)
+    return WordMatcher(words)
+
+
+@receiver(setting_changed)
+def reset_bad_words_matcher(setting, **kwargs):
+    if setting == 'BAD_WORDS_FILE':
+        get_bad_words_matcher.cache_clear()
+
+
 class CommentForm(ModelForm):
 
     class Meta:
@@ -20,8 +45,6 @@ class CommentForm(ModelForm):
     def clean_text(self):
         """Не позволяем ругаться в комментариях."""
         text = self.cleaned_data['text']
-        lowered_text = text.lower()
-        for word in BAD_WORDS:
-            if word in lowered_text:
-                raise ValidationError(WARNING)
+        if get_bad_words_matcher().search(text):
+            raise ValidationError(WARNING)
         return text
@@ -0,0 +1,108 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from wsgiref.util import setup_testing_defaults
+
+from django.core.asgi import get_asgi_application
+from django.core.wsgi import get_wsgi_application
+
+from .profiling import percentiles
+
+HOST = 'testserver'
+
+
+def wsgi_get(application, path):
+    """GET-запрос к WSGI-приложению, возвращает код ответа."""
+    environ = {'PATH_INFO': path, 'HTTP_HOST': HOST}
+    setup_testing_defaults(environ)
+    statuses = []
+
+    def start_response(status, headers, exc_info=None):
+        statuses.append(int(status.split()[0]))
+
+    response = application(environ, start_response)
+    try:
+        b''.join(response)
+    finally:
+        response.close()
+    return statuses[0]
+
+
+async def asgi_get(application, path):
+    """GET-запрос к ASGI-приложению, возвращает код ответа."""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', HOST.encode())],
+        'client': ('127.0.0.1', 0),
+        'server': (HOST, 80),
+    }
+    statuses = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+
+    await application(scope, receive, send)
+    return statuses[0]
+
+
+def summarize(results, seconds):
+    """Запросы в секунду, процентили задержки в мс и число ошибок."""
+    latencies = [latency * 1000 for latency, _ in results]
+    return {
+        'rps': round(len(results) / seconds),
+        **percentiles(latencies),
+        'errors': sum(status >= 400 for _, status in results),
+    }
+
+
+def run_wsgi(path, requests, concurrency):
+    """
+    Нагрузка на WSGI-приложение: concurrency потоков, как у
+    многопоточного сервера, выполняют requests запросов.
+    """
+    application = get_wsgi_application()
+
+    def timed(_):
+        start = perf_counter()
+        status = wsgi_get(application, path)
+        return perf_counter() - start, status
+
+    start = perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        results = list(executor.map(timed, range(requests)))
+    return summarize(results, perf_counter() - start)
+
+
+def run_asgi(path, requests, concurrency):
+    """
+    Нагрузка на ASGI-приложение: не больше concurrency запросов
+    одновременно в одном цикле событий.
+    """
+    application = get_asgi_application()
+
+    async def run():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def timed():
+            async with semaphore:
+                start = perf_counter()
+                status = await asgi_get(application, path)
+                return perf_counter() - start, status
+
+        return await asyncio.gather(*(timed() for _ in range(requests)))
+
+    start = perf_counter()
+    results = asyncio.run(run())
+    return summarize(results, perf_counter() - start)
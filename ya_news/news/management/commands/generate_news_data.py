@@ -0,0 +1,42 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from news.fake_data import generate_news_data
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт синтетических пользователей, новости и комментарии '
+        'для нагрузочного тестирования.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--news', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=100000)
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько последних дней создавать новости.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        start = perf_counter()
+        generate_news_data(
+            users=options['users'],
+            news=options['news'],
+            comments=options['comments'],
+            days=options['days'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+        )
+        elapsed = perf_counter() - start
+        rows = options['users'] + options['news'] + options['comments']
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано {options["users"]} пользователей, '
+            f'{options["news"]} новостей и {options["comments"]} '
+            f'комментариев за {elapsed:.2f} с '
+            f'({rows / elapsed if elapsed else 0:.0f} строк/с)'
+        ))
@@ -0,0 +1,194 @@
+import csv
+import json
+import sys
+from contextlib import contextmanager
+from datetime import date
+from email.utils import parsedate_to_datetime
+from itertools import islice
+from time import perf_counter
+from xml.etree.ElementTree import ParseError, iterparse
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from news.cache import bump_home_version
+from news.models import News
+from news.search import index_news
+
+FORMATS = ('jsonl', 'csv', 'rss')
+STDIN = '-'
+
+
+@contextmanager
+def open_source(path, file_format):
+    """Файл или stdin для пути «-»; RSS читается в байтах."""
+    binary = file_format == 'rss'
+    if path == STDIN:
+        yield sys.stdin.buffer if binary else sys.stdin
+        return
+    if binary:
+        with open(path, 'rb') as stream:
+            yield stream
+    else:
+        with open(path, encoding='utf-8', newline='') as stream:
+            yield stream
+
+
+def read_rss(stream):
+    """
+    Потоково разбирает элементы item, освобождая прочитанные.
+
+    После ошибки разбора XML дальше ленту не прочитать: ошибка
+    возвращается последней записью с номером строки документа.
+    """
+    number = 0
+    try:
+        for _, element in iterparse(stream):
+            if element.tag != 'item':
+                continue
+            number += 1
+            yield f'элемент {number}', {
+                'title': element.findtext('title', ''),
+                'text': element.findtext('description', ''),
+                'published': element.findtext('pubDate'),
+            }, None
+            element.clear()
+    except ParseError as error:
+        yield f'строка {error.position[0]}', None, error
+
+
+def read_rows(stream, file_format):
+    """Записи ленты (место в файле, строка, ошибка разбора или None)."""
+    if file_format == 'rss':
+        yield from read_rss(stream)
+    elif file_format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield f'строка {reader.line_num}', row, None
+    else:
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as error:
+                yield f'строка {number}', None, error
+            else:
+                yield f'строка {number}', row, None
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает новости из JSON Lines, CSV или RSS (title, text, date), '
+        'пропуская уже существующие по хэшу содержимого и некорректные.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл ленты, «-» - stdin.')
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or self.detect_format(options['path'])
+        self.max_title_length = News._meta.get_field('title').max_length
+        created = skipped = 0
+        self.invalid = 0
+        start = perf_counter()
+        with open_source(options['path'], file_format) as stream:
+            rows = read_rows(stream, file_format)
+            while True:
+                batch = list(islice(rows, options['batch_size']))
+                if not batch:
+                    break
+                invalid = self.invalid
+                batch_created = self.ingest_batch(batch)
+                created += batch_created
+                skipped += (
+                    len(batch) - batch_created - (self.invalid - invalid)
+                )
+                if options['verbosity'] > 1:
+                    self.stdout.write(
+                        f'Добавлено: {created}, пропущено: {skipped}'
+                    )
+        elapsed = perf_counter() - start
+        total = created + skipped + self.invalid
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано {total} новостей за {elapsed:.2f} с '
+            f'({total / elapsed if elapsed else 0:.0f} новостей/с): '
+            f'добавлено {created}, пропущено повторов {skipped}, '
+            f'некорректных {self.invalid}'
+        ))
+
+    @staticmethod
+    def detect_format(path):
+        for file_format in FORMATS:
+            if str(path).lower().endswith(f'.{file_format}'):
+                return file_format
+        if str(path).lower().endswith('.xml'):
+            return 'rss'
+        return 'jsonl'
+
+    def make_news(self, place, row, error):
+        """
+        Новость из строки ленты или None для некорректной строки.
+
+        Некорректная или неразобранная строка, в том числе
+        с неразборчивой датой, пропускается с сообщением в stderr
+        и номером строки, остальные загружаются.
+        """
+        if error is None:
+            try:
+                title = row['title'].strip()[:self.max_title_length]
+                news = News(title=title, text=row.get('text') or '')
+                if row.get('published'):
+                    news.date = parsedate_to_datetime(
+                        row['published']
+                    ).date()
+                elif row.get('date'):
+                    news.date = date.fromisoformat(row['date'])
+            except (
+                KeyError, AttributeError, TypeError, ValueError
+            ) as row_error:
+                error = row_error
+            else:
+                news.content_hash = News.get_content_hash(
+                    news.title, news.text
+                )
+                return news
+        self.invalid += 1
+        if row is None:
+            self.stderr.write(f'Некорректная новость, {place}: {error}')
+        else:
+            self.stderr.write(
+                f'Некорректная новость, {place}: {row!r}: {error}'
+            )
+        return None
+
+    def ingest_batch(self, batch):
+        """
+        Добавляет новости пачки, которых ещё нет в базе и в пачке.
+
+        Повторы отсеиваются заранее, чтобы посчитать и проиндексировать
+        только новые; ignore_conflicts не даёт упасть на новости,
+        добавленной параллельной загрузкой той же ленты.
+        """
+        news_list = {}
+        for place, row, error in batch:
+            news = self.make_news(place, row, error)
+            if news is not None:
+                news_list.setdefault(news.content_hash, news)
+        with transaction.atomic():
+            existing = set(News.objects.filter(
+                content_hash__in=news_list
+            ).values_list('content_hash', flat=True))
+            new_news = [
+                news for content_hash, news in news_list.items()
+                if content_hash not in existing
+            ]
+            News.objects.bulk_create(new_news, ignore_conflicts=True)
+            index_news(News.objects.filter(content_hash__in=[
+                news.content_hash for news in new_news
+            ]).only('title', 'text'), replace=False)
+        if new_news:
+            bump_home_version()
+        return len(new_news)
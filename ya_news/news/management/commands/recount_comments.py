@@ -0,0 +1,28 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from news.cache import bump_home_version
+from news.counters import recount_comments
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает счётчики комментариев новостей, исправляет '
+        'расходящиеся и собирает заново часовые счётчики рейтингов, '
+        'удаляя вышедшие из окон.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        start = perf_counter()
+        checked, fixed = recount_comments(options['batch_size'])
+        if fixed:
+            bump_home_version()
+        elapsed = perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено {checked} новостей, исправлено {fixed} '
+            f'за {elapsed:.2f} с'
+        ))
@@ -0,0 +1,40 @@
+from hashlib import sha256
+
+from django.db import migrations, models
+
+
+BATCH_SIZE = 1000
+
+
+def get_content_hash(title, text):
+    """Копия News.get_content_hash на момент миграции."""
+    content = '\n'.join(' '.join(value.split()) for value in (title, text))
+    return sha256(content.encode()).hexdigest()
+
+
+def fill_content_hash(apps, schema_editor):
+    News = apps.get_model('news', 'News')
+    batch = []
+    for news in News.objects.only('title', 'text').iterator(BATCH_SIZE):
+        news.content_hash = get_content_hash(news.title, news.text)
+        batch.append(news)
+        if len(batch) == BATCH_SIZE:
+            News.objects.bulk_update(batch, ('content_hash',))
+            batch = []
+    News.objects.bulk_update(batch, ('content_hash',))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+        migrations.RunPython(fill_content_hash, migrations.RunPython.noop),
+    ]
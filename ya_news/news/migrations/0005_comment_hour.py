@@ -0,0 +1,56 @@
+# Generated by Django 3.2.15 on 2026-10-18 17:31
+
+from datetime import timedelta, timezone
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncHour
+from django.utils import timezone as django_timezone
+import django.db.models.deletion
+
+# Самое длинное окно рейтинга на момент миграции, в часах.
+LONGEST_WINDOW_HOURS = 7 * 24
+
+
+def fill_comment_hours(apps, schema_editor):
+    Comment = apps.get_model('news', 'Comment')
+    CommentHour = apps.get_model('news', 'CommentHour')
+    since = django_timezone.now().astimezone(timezone.utc).replace(
+        minute=0, second=0, microsecond=0
+    ) - timedelta(hours=LONGEST_WINDOW_HOURS - 1)
+    rows = Comment.objects.filter(created__gte=since).annotate(
+        hour=TruncHour('created', tzinfo=timezone.utc)
+    ).order_by().values_list('news', 'hour').annotate(count=Count('pk'))
+    CommentHour.objects.bulk_create(
+        (CommentHour(news_id=news_id, hour=hour, count=count)
+         for news_id, hour, count in rows.iterator()),
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0004_news_comment_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommentHour',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('news', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comment_hours', to='news.news')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='commenthour',
+            index=models.Index(fields=['hour', 'news', 'count'], name='comment_hour_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='commenthour',
+            constraint=models.UniqueConstraint(fields=('news', 'hour'), name='comment_hour_news_hour_uniq'),
+        ),
+        migrations.RunPython(fill_comment_hours, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 3.2.15 on 2026-10-18 17:42
+
+import re
+from collections import Counter
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+BATCH_SIZE = 1000
+TERM = re.compile(r'\w+')
+TERM_MAX_LENGTH = 50
+TITLE_TERM_WEIGHT = 3
+
+
+def get_terms(text):
+    """Копия news.search.get_terms на момент миграции."""
+    return [
+        term[:TERM_MAX_LENGTH]
+        for term in TERM.findall(text.lower().replace('ё', 'е'))
+        if len(term) > 1
+    ]
+
+
+def get_term_weights(text, title=''):
+    """Копия news.search.get_term_weights на момент миграции."""
+    weights = Counter(get_terms(text))
+    for term in get_terms(title):
+        weights[term] += TITLE_TERM_WEIGHT
+    return weights
+
+
+def fill_search_terms(apps, schema_editor):
+    News = apps.get_model('news', 'News')
+    Comment = apps.get_model('news', 'Comment')
+    SearchTerm = apps.get_model('news', 'SearchTerm')
+    documents = (
+        ((news.pk, None, news.text, news.title)
+         for news in News.objects.only('title', 'text').iterator(BATCH_SIZE)),
+        ((comment.news_id, comment.pk, comment.text, '')
+         for comment in Comment.objects.only(
+             'news_id', 'text'
+         ).iterator(BATCH_SIZE)),
+    )
+    batch = []
+    for rows in documents:
+        for news_id, comment_id, text, title in rows:
+            batch.extend(
+                SearchTerm(
+                    news_id=news_id,
+                    comment_id=comment_id,
+                    term=term,
+                    weight=weight
+                )
+                for term, weight in get_term_weights(text, title).items()
+            )
+            if len(batch) >= BATCH_SIZE:
+                SearchTerm.objects.bulk_create(batch)
+                batch = []
+    SearchTerm.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_comment_hour'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=50)),
+                ('weight', models.PositiveIntegerField()),
+                ('comment', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='news.comment')),
+                ('news', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='news.news')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='searchterm',
+            index=models.Index(fields=['term', 'news', 'weight'], name='search_term_idx'),
+        ),
+        migrations.RunPython(fill_search_terms, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 3.2.15 on 2026-10-18 18:53
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def clear_duplicate_hashes(apps, schema_editor):
+    """
+    Оставляет хэш только у первой из новостей с одинаковым содержимым.
+
+    Повторы не удаляются: у них могут быть комментарии, а пустой хэш
+    под ограничение не попадает.
+    """
+    News = apps.get_model('news', 'News')
+    duplicates = News.objects.exclude(content_hash='').values(
+        'content_hash'
+    ).annotate(first_id=Min('id'), total=Count('id')).filter(total__gt=1)
+    for duplicate in duplicates:
+        News.objects.filter(
+            content_hash=duplicate['content_hash']
+        ).exclude(id=duplicate['first_id']).update(content_hash='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0006_search_term'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_duplicate_hashes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='news',
+            constraint=models.UniqueConstraint(condition=models.Q(('content_hash', ''), _negated=True), fields=('content_hash',), name='news_content_hash_uniq'),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from datetime import datetime
+from hashlib import sha256
 
 from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import models
 
 
@@ -8,15 +10,48 @@ class News(models.Model):
     title = models.CharField(max_length=50)
     text = models.TextField()
     date = models.DateField(default=datetime.today)
+    content_hash = models.CharField(
+        max_length=64,
+        db_index=True,
+        editable=False,
+        blank=True
+    )
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ('-date',)
+        constraints = (
+            # Пустой хэш бывает у новостей из bulk_create без хэша.
+            models.UniqueConstraint(
+                fields=('content_hash',),
+                condition=~models.Q(content_hash=''),
+                name='news_content_hash_uniq'
+            ),
+        )
+        indexes = (
+            models.Index(fields=('date', 'id'), name='news_date_id_idx'),
+        )
         verbose_name_plural = 'Новости'
         verbose_name = 'Новость'
 
     def __str__(self):
         return self.title
 
+    def clean(self):
+        content_hash = self.get_content_hash(self.title, self.text)
+        if News.objects.filter(
+            content_hash=content_hash
+        ).exclude(pk=self.pk).exists():
+            raise ValidationError(
+                'Новость с таким заголовком и текстом уже есть.'
+            )
+
+    @staticmethod
+    def get_content_hash(title, text):
+        """Хэш заголовка и текста без учёта пробельных символов."""
+        content = '\n'.join(' '.join(value.split()) for value in (title, text))
+        return sha256(content.encode()).hexdigest()
+
 
 class Comment(models.Model):
     news = models.ForeignKey(
@@ -32,6 +67,70 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('created',)
+        indexes = (
+            models.Index(
+                fields=('news', 'created', 'id'),
+                name='comment_news_created_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text[:50]
+
+
+class CommentHour(models.Model):
+    """Число комментариев новости за час, из них собираются рейтинги."""
+    news = models.ForeignKey(
+        News,
+        on_delete=models.CASCADE,
+        related_name='comment_hours'
+    )
+    hour = models.DateTimeField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('news', 'hour'), name='comment_hour_news_hour_uniq'
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('hour', 'news', 'count'), name='comment_hour_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.news_id} {self.hour}: {self.count}'
+
+
+class SearchTerm(models.Model):
+    """
+    Слово новости или комментария в поисковом индексе, см. news.search.
+
+    У слов самой новости comment пустой, у слов комментария
+    news - его новость: поиск выдаёт новости.
+    """
+    news = models.ForeignKey(
+        News,
+        on_delete=models.CASCADE,
+        related_name='search_terms'
+    )
+    comment = models.ForeignKey(
+        Comment,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name='search_terms'
+    )
+    term = models.CharField(max_length=50)
+    weight = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('term', 'news', 'weight'), name='search_term_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.term}: {self.news_id}'
@@ -0,0 +1,130 @@
+import re
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+from .models import News
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+CURSOR_SEPARATOR = '-'
+# Две части курсора, не больше 18 цифр: помещаются в INTEGER SQLite.
+CURSOR = re.compile(r'(\d{1,18})-(\d{1,18})')
+
+
+def encode_cursor(comment):
+    """Курсор комментария: микросекунды от эпохи и id."""
+    created = (comment.created - EPOCH) // MICROSECOND
+    return f'{created}{CURSOR_SEPARATOR}{comment.pk}'
+
+
+def decode_cursor(cursor):
+    """Разбирает курсор, некорректный курсор - это 404."""
+    match = CURSOR.fullmatch(cursor)
+    if match is None:
+        raise Http404('Некорректный курсор.')
+    created, pk = map(int, match.groups())
+    try:
+        return EPOCH + created * MICROSECOND, pk
+    except OverflowError:
+        raise Http404('Некорректный курсор.')
+
+
+class CommentPage:
+    """
+    Страница комментариев, выбранная по курсору (created, id).
+
+    Вместо OFFSET используется условие по ключу сортировки,
+    поэтому стоимость запроса не зависит от номера страницы.
+    Запрос выполняется лениво, при первом обращении к комментариям.
+    """
+
+    def __init__(self, queryset, cursor=None, per_page=None):
+        self.queryset = queryset.order_by('created', 'id')
+        self.cursor = cursor
+        self.per_page = per_page or settings.COMMENTS_COUNT_ON_PAGE
+        if cursor:
+            created, pk = decode_cursor(cursor)
+            self.queryset = self.queryset.filter(
+                Q(created__gt=created) | Q(id__gt=pk),
+                created__gte=created
+            )
+
+    @cached_property
+    def _rows(self):
+        return list(self.queryset[:self.per_page + 1])
+
+    @property
+    def object_list(self):
+        return self._rows[:self.per_page]
+
+    @property
+    def has_next(self):
+        return len(self._rows) > self.per_page
+
+    @property
+    def next_cursor(self):
+        if not self.has_next:
+            return None
+        return encode_cursor(self.object_list[-1])
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class SearchPage:
+    """
+    Страница результатов поиска по курсору (score, id новости).
+
+    Вес считается при группировке, поэтому условие курсора попадает
+    в HAVING: страница не пропускает строки через OFFSET, но все
+    совпадения запроса всё равно суммируются.
+    """
+
+    def __init__(self, ranking, cursor=None, per_page=None):
+        self.ranking = ranking
+        self.per_page = per_page or settings.NEWS_SEARCH_COUNT_ON_PAGE
+        if cursor:
+            match = CURSOR.fullmatch(cursor)
+            if match is None:
+                raise Http404('Некорректный курсор.')
+            score, pk = map(int, match.groups())
+            self.ranking = self.ranking.filter(
+                Q(score__lt=score) | Q(score=score, news_id__lt=pk)
+            )
+
+    @cached_property
+    def _rows(self):
+        return list(self.ranking[:self.per_page + 1])
+
+    @cached_property
+    def object_list(self):
+        """Новости страницы одним запросом, у каждой - её score."""
+        rows = self._rows[:self.per_page]
+        news = News.objects.in_bulk([pk for pk, *_ in rows])
+        for pk, score, *_ in rows:
+            news[pk].score = score
+        return [news[pk] for pk, *_ in rows]
+
+    @property
+    def has_next(self):
+        return len(self._rows) > self.per_page
+
+    @property
+    def next_cursor(self):
+        if not self.has_next:
+            return None
+        pk, score, *_ = self._rows[self.per_page - 1]
+        return f'{score}{CURSOR_SEPARATOR}{pk}'
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
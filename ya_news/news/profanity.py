@@ -0,0 +1,65 @@
+from collections import deque
+
+
+class WordMatcher:
+    """
+    Автомат Ахо-Корасик для поиска запрещённых слов.
+
+    Строится один раз по списку слов, после чего проверяет текст
+    за один проход независимо от размера списка.
+    """
+
+    def __init__(self, words):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [False]
+        for word in words:
+            word = word.strip().lower()
+            if word:
+                self._add(word)
+        self._link()
+
+    def _add(self, word):
+        state = 0
+        for char in word:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(False)
+            state = next_state
+        self._output[state] = True
+
+    def _link(self):
+        """Проставляет ссылки неудач обходом бора в ширину."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                if self._output[self._fail[next_state]]:
+                    self._output[next_state] = True
+
+    def search(self, text):
+        """Есть ли в тексте хотя бы одно слово из списка."""
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                return True
+        return False
+
+
+def read_words(path):
+    """Читает список слов из файла: по одному слову в строке."""
+    with open(path, encoding='utf-8') as file:
+        return [line.strip() for line in file if line.strip()]
@@ -1,32 +1,171 @@
+import re
+from contextlib import contextmanager
+from copy import deepcopy
 from datetime import datetime, timedelta
+from importlib import import_module
 
 import pytest
+from django.apps import apps
 from django.conf import settings
+from django.contrib.auth import (BACKEND_SESSION_KEY, HASH_SESSION_KEY,
+                                 SESSION_KEY, get_user_model)
+from django.core.cache import cache
+from django.db import connection
+from django.db.models.signals import post_migrate
 from django.test import Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from news.fake_data import generate_news_data
 from news.models import Comment, News
+from news.search import index_new_documents
+
+ASYNC_URLCONF = 'yanews.async_urls'
+COMMENTS_PER_NEWS = 10
+LARGE_NEWS_COUNT = 1000
+LARGE_USERS_COUNT = 50
+LARGE_COMMENTS_COUNT = 20000
+# Полный просмотр таблицы или сортировка во временном дереве.
+SLOW_PLAN = re.compile(r'^SCAN (TABLE )?\w+$|USE TEMP B-TREE FOR ORDER BY')
+# Общие данные тестов, заполняются в seed_data.
+SEED = {}
+
+
+def create_session(user):
+    """
+    Сессия пользователя, как после force_login, возвращает её ключ.
+
+    Сигналы входа и обновление last_login не выполняются, для
+    тестовых клиентов они не нужны.
+    """
+    session = import_module(settings.SESSION_ENGINE).SessionStore()
+    session[SESSION_KEY] = user._meta.pk.value_to_string(user)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.save()
+    return session.session_key
+
+
+def login_client(user):
+    """
+    Клиент, вошедший как user.
+
+    Для пользователей из общих данных сессия создана заранее, и
+    клиенту остаётся только выставить cookie. Заготовки годятся
+    только для хранилища сессий, в котором созданы.
+    """
+    client = Client()
+    client.cookies[settings.SESSION_COOKIE_NAME] = (
+        SEED['sessions'].get((settings.SESSION_ENGINE, user.pk))
+        or create_session(user)
+    )
+    return client
+
+
+def create_seed():
+    """
+    Автор, администратор и их сессии, новость с двумя комментариями
+    и ленту новостей.
+
+    Раньше всё это заново создавалось фикстурами каждого теста.
+    """
+    User = get_user_model()
+    author = User.objects.create(username='Автор')
+    admin = User.objects.create(
+        username='admin', is_staff=True, is_superuser=True
+    )
+    news = News.objects.create(title='Заголовок', text='Текст заметки')
+    comments_list = [
+        Comment.objects.create(
+            news=news, author=author, text=f'Текст {index}'
+        ) for index in range(2)
+    ]
+    today = datetime.today()
+    News.objects.bulk_create(
+        News(title=f'Новость {index}',
+             text='Просто текст.',
+             date=today - timedelta(days=index),
+             content_hash=News.get_content_hash(
+                 f'Новость {index}', 'Просто текст.'
+             ))
+        for index in range(settings.NEWS_COUNT_ON_HOME_PAGE + 1)
+    )
+    index_new_documents(news_after=news.pk)
+    news.refresh_from_db()
+    return {
+        'author': author,
+        'admin': admin,
+        'sessions': {
+            (settings.SESSION_ENGINE, user.pk): create_session(user)
+            for user in (author, admin)
+        },
+        'news': news,
+        'comments_list': comments_list,
+        'news_list': list(News.objects.filter(
+            pk__gt=news.pk
+        ).order_by('id')),
+    }
+
+
+def seed_data(**kwargs):
+    """
+    Заполняет общие данные после миграций тестовой базы.
+
+    Так они создаются один раз на процесс pytest, а каждый тест
+    работает в транзакции, откатываемой до этого состояния, как
+    setUpTestData в TestCase. Тесты с transaction=True очищают базу
+    целиком, после очистки снова приходит post_migrate, и данные
+    создаются заново.
+    """
+    SEED.update(create_seed())
+
+
+post_migrate.connect(seed_data, sender=apps.get_app_config('news'))
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def async_views(settings):
+    """Подключает асинхронные версии главной и страницы новости."""
+    settings.ROOT_URLCONF = ASYNC_URLCONF
+
+
+@pytest.fixture(params=settings.SESSION_ENGINES)
+def session_mode(request, settings):
+    """Включает по очереди каждое хранилище сессий из настроек."""
+    settings.SESSION_ENGINE = settings.SESSION_ENGINES[request.param]
+    return request.param
 
 
 @pytest.fixture
-def author(django_user_model):
-    return django_user_model.objects.create(username='Автор')
+def author(db):
+    return deepcopy(SEED['author'])
 
 
 @pytest.fixture
 def author_client(author):
-    client = Client()
-    client.force_login(author)
-    return client
+    return login_client(author)
 
 
 @pytest.fixture
-def news():
-    news = News.objects.create(
-        title='Заголовок',
-        text='Текст заметки',
-    )
-    return news
+def admin_user(db):
+    """Администратор из общих данных вместо создаваемого pytest-django."""
+    return deepcopy(SEED['admin'])
+
+
+@pytest.fixture
+def admin_client(admin_user):
+    return login_client(admin_user)
+
+
+@pytest.fixture
+def news(db):
+    """Общая новость; копия, чтобы изменения не попали в другие тесты."""
+    return deepcopy(SEED['news'])
 
 
 @pytest.fixture
@@ -36,19 +175,14 @@ def comment(author, news):
         author=author,
         text='Текст комментария',
     )
+    news.refresh_from_db(fields=('comment_count',))
     return comment
 
 
 @pytest.fixture
-def comments_list(news, author):
-    comments_list = [
-        Comment.objects.create(
-            news=news,
-            author=author,
-            text=f'Текст {index}'
-        ) for index in range(2)
-    ]
-    return comments_list
+def comments_list(db):
+    """Два общих комментария к общей новости."""
+    return deepcopy(SEED['comments_list'])
 
 
 @pytest.fixture
@@ -62,15 +196,23 @@ def detail_url(news):
 
 
 @pytest.fixture
-def news_list():
-    today = datetime.today()
-    news_list = News.objects.bulk_create(
-        [News(title=f'Новость {index}',
-              text='Просто текст.',
-              date=today - timedelta(days=index))
-            for index in range(settings.NEWS_COUNT_ON_HOME_PAGE + 1)]
-    )
-    return news_list
+def comments_url(news):
+    return reverse('news:comments', args=(news.id,))
+
+
+@pytest.fixture
+def news_list(db):
+    """Общая лента новостей без комментариев, по возрастанию id."""
+    return deepcopy(SEED['news_list'])
+
+
+@pytest.fixture
+def news_list_comments(news, news_list, author):
+    return [
+        Comment.objects.create(news=news, author=author, text=f'Текст {index}')
+        for news in News.objects.all()
+        for index in range(COMMENTS_PER_NEWS)
+    ]
 
 
 @pytest.fixture
@@ -88,6 +230,26 @@ def url_to_comments(detail_url):
     return detail_url + '#comments'
 
 
+@pytest.fixture
+def discussed_url():
+    return reverse('news:discussed', args=('day',))
+
+
+@pytest.fixture
+def search_url():
+    return reverse('news:search')
+
+
+@pytest.fixture
+def cache_stats_url():
+    return reverse('news:cache_stats')
+
+
+@pytest.fixture
+def profiling_url():
+    return reverse('news:profiling')
+
+
 @pytest.fixture
 def login_url():
     return reverse('users:login')
@@ -101,3 +263,59 @@ def logout_url():
 @pytest.fixture
 def signup_url():
     return reverse('users:signup')
+
+
+@pytest.fixture
+def make_dataset():
+    """
+    Фабрика синтетических данных, см. news.fake_data.
+
+    Возвращает id пользователей и id новостей по убыванию числа
+    комментариев.
+    """
+    return generate_news_data
+
+
+@pytest.fixture
+def large_dataset(make_dataset):
+    """Большой набор данных для тестов производительности."""
+    return make_dataset(
+        users=LARGE_USERS_COUNT,
+        news=LARGE_NEWS_COUNT,
+        comments=LARGE_COMMENTS_COUNT
+    )
+
+
+@pytest.fixture
+def benchmark_report(capsys):
+    """Печатает результаты замеров в обход перехвата вывода."""
+    def report(title, **results):
+        with capsys.disabled():
+            print(f'\n{title}')
+            for name, value in results.items():
+                print(f'  {name}: {value}')
+    return report
+
+
+@pytest.fixture
+def assert_uses_indexes():
+    """
+    Проверяет планы SELECT-запросов, выполненных внутри блока.
+
+    Каждый запрос должен читать таблицы по индексу и не сортировать
+    результат во временном дереве.
+    """
+    @contextmanager
+    def check():
+        with CaptureQueriesContext(connection) as context:
+            yield
+        for query in context.captured_queries:
+            if not query['sql'].startswith('SELECT'):
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+                plan = [row[-1] for row in cursor.fetchall()]
+            assert not any(map(SLOW_PLAN.search, plan)), (
+                f'{query["sql"]}\n' + '\n'.join(plan)
+            )
+    return check
@@ -0,0 +1,306 @@
+from copy import deepcopy
+from timeit import repeat
+
+import pytest
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from news.counters import most_discussed, window_start
+from news.forms import BAD_WORDS
+from news.loadtest import run_asgi, run_wsgi
+from news.models import Comment, News
+from news.pagination import SearchPage
+from news.profanity import WordMatcher
+from news.search import search_news
+from news.urls import urlpatterns
+from news.views import NewsDetail
+from .conftest import SEED, create_seed, login_client
+
+pytestmark = pytest.mark.benchmark
+
+REPEAT = 5
+REQUESTS = 200
+LOAD_REQUESTS = 500
+# Новости и комментарии набора для поиска; последний размер требует
+# несколько гигабайт памяти под тестовую базу SQLite.
+SEARCH_SIZES = (
+    (10000, 100000),
+    (100000, 1000000),
+    (1000000, 10000000),
+)
+SEARCH_QUERIES = ('маяк', 'нов', 'парк фестив', 'подробност отличн')
+RARE_NEWS_COUNT = 20
+# Страницы вошедшего пользователя для сравнения хранилищ сессий.
+SESSION_PAGES = (
+    'home_url', 'detail_url', 'edit_url', 'delete_url', 'discussed_url'
+)
+
+
+def best_time(func):
+    return min(repeat(func, number=1, repeat=REPEAT))
+
+
+def per_request_detail(request, *args, **kwargs):
+    """Прежний путь: представление новости создаётся на каждый запрос."""
+    return NewsDetail.as_view()(request, *args, **kwargs)
+
+
+@pytest.mark.parametrize('words_count', (100, 1000, 10000))
+@pytest.mark.parametrize('text_length', (1000, 100000))
+def test_bad_words_matcher(benchmark_report, words_count, text_length):
+    """Сравнивает автомат с поиском подстроки для каждого слова"""
+    words = BAD_WORDS + tuple(f'слово{index}' for index in range(words_count))
+    text = ('Обычный вежливый комментарий. ' * text_length)[:text_length]
+
+    def loop():
+        lowered_text = text.lower()
+        return any(word in lowered_text for word in words)
+
+    matcher = WordMatcher(words)
+    assert matcher.search(text) == loop()
+    loop_time = best_time(loop)
+    matcher_time = best_time(lambda: matcher.search(text))
+    benchmark_report(
+        f'BAD_WORDS: {words_count} слов, текст {text_length} символов',
+        loop=f'{loop_time * 1000:.2f} мс',
+        matcher=f'{matcher_time * 1000:.2f} мс',
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'method, client_fixture',
+    (
+        ('get', 'client'),
+        ('get', 'author_client'),
+        ('post', 'author_client'),
+    )
+)
+def test_detail_requests_per_second(
+        request,
+        monkeypatch,
+        benchmark_report,
+        comments_list,
+        detail_url,
+        method,
+        client_fixture
+):
+    """
+    Число запросов в секунду к странице новости через тестовый клиент
+
+    Для сравнения тот же замер повторяется с прежним путём,
+    где as_view() вызывался на каждый запрос.
+    """
+    client = request.getfixturevalue(client_fixture)
+    if method == 'post':
+        def send():
+            client.post(detail_url, data={'text': 'Комментарий'})
+    else:
+        def send():
+            client.get(detail_url)
+
+    def requests_per_second():
+        send()
+        return REQUESTS / min(repeat(send, number=REQUESTS, repeat=REPEAT))
+
+    rps = requests_per_second()
+    detail = next(
+        pattern for pattern in urlpatterns if pattern.name == 'detail'
+    )
+    monkeypatch.setattr(detail, 'callback', per_request_detail)
+    baseline_rps = requests_per_second()
+    benchmark_report(
+        f'{method.upper()} {detail_url}, {client_fixture}',
+        as_view_per_request=f'{baseline_rps:.0f} запросов/с',
+        rps=f'{rps:.0f} запросов/с',
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize('concurrency', (1, 10, 50))
+@pytest.mark.parametrize('url_fixture', ('home_url', 'detail_url'))
+def test_asgi_load(request,
+                   benchmark_report,
+                   comments_list,
+                   news_list,
+                   url_fixture,
+                   concurrency):
+    """Сравнивает WSGI и ASGI с синхронными и асинхронными страницами"""
+    url = request.getfixturevalue(url_fixture)
+    results = {
+        'wsgi': run_wsgi(url, LOAD_REQUESTS, concurrency),
+        'asgi': run_asgi(url, LOAD_REQUESTS, concurrency),
+    }
+    request.getfixturevalue('async_views')
+    results['asgi, async'] = run_asgi(url, LOAD_REQUESTS, concurrency)
+    for result in results.values():
+        assert result['errors'] == 0
+    benchmark_report(
+        f'{url}, {concurrency} одновременно, {LOAD_REQUESTS} запросов',
+        **{
+            name: ', '.join(f'{key} {value}' for key, value in result.items()
+                            if key != 'errors')
+            for name, result in results.items()
+        }
+    )
+
+
+@pytest.mark.django_db
+def test_seed_setup(benchmark_report):
+    """Сравнивает создание общих данных в каждом тесте с их копированием"""
+    # Как в пустой базе до общих данных; откатится вместе с тестом.
+    News.objects.all().delete()
+    get_user_model().objects.all().delete()
+
+    def create():
+        with transaction.atomic():
+            create_seed()
+            transaction.set_rollback(True)
+
+    create_time = best_time(create)
+    copy_time = best_time(lambda: deepcopy(SEED))
+    benchmark_report(
+        'Подготовка общих данных на тест',
+        create=f'{create_time * 1000:.2f} мс',
+        copy=f'{copy_time * 1000:.2f} мс',
+        saved=f'{(create_time - copy_time) * 1000:.2f} мс',
+    )
+
+
+@pytest.mark.django_db
+def test_logged_in_clients(benchmark_report, django_user_model, author):
+    """Сравнивает force_login с заранее созданными сессиями"""
+    def force_login_author():
+        Client().force_login(author)
+
+    def force_login_admin():
+        admin = django_user_model.objects.create_superuser(
+            f'admin-{django_user_model.objects.count()}',
+            'admin@example.com', 'password'
+        )
+        Client().force_login(admin)
+
+    benchmark_report(
+        'Клиент вошедшего пользователя на тест',
+        force_login_author=f'{best_time(force_login_author) * 1000:.2f} мс',
+        force_login_admin=f'{best_time(force_login_admin) * 1000:.2f} мс',
+        login_client=(
+            f'{best_time(lambda: login_client(author)) * 1000:.2f} мс'
+        ),
+    )
+
+
+def session_queries(client, url, method='get', data=None):
+    """Запросов к таблице сессий и всего запросов на один запрос."""
+    with CaptureQueriesContext(connection) as context:
+        getattr(client, method)(url, data)
+    return sum(
+        'django_session' in query['sql']
+        for query in context.captured_queries
+    ), len(context)
+
+
+@pytest.mark.django_db
+def test_session_engines(request, benchmark_report, settings, comment,
+                         login_url):
+    """Сравнивает запросы и время страниц с разными хранилищами сессий"""
+    author = comment.author
+    author.set_password('password')
+    author.save()
+    urls = {name: request.getfixturevalue(name) for name in SESSION_PAGES}
+    results = {'login': []}
+    for mode, engine in settings.SESSION_ENGINES.items():
+        settings.SESSION_ENGINE = engine
+        client = Client()
+        found, total = session_queries(
+            client, login_url, 'post',
+            {'username': author.username, 'password': 'password'}
+        )
+        results['login'].append(f'{mode} {found}/{total}')
+        for name, url in urls.items():
+            client.get(url)
+            found, total = session_queries(client, url)
+            results.setdefault(name, []).append(f'{mode} {found}/{total}')
+
+        def send():
+            for _ in range(REQUESTS // len(urls)):
+                for url in urls.values():
+                    client.get(url)
+
+        results.setdefault('time', []).append(
+            f'{mode} {best_time(send) * 1000 / REQUESTS:.2f} мс'
+        )
+    benchmark_report(
+        'Запросы к сессиям / всего запросов и время страницы вошедшего',
+        **{name: ', '.join(row) for name, row in results.items()}
+    )
+
+
+def naive_most_discussed(hours, count):
+    """Рейтинг группировкой всех комментариев окна при каждом запросе."""
+    totals = dict(
+        Comment.objects.filter(
+            created__gte=window_start(hours)
+        ).values_list('news').annotate(
+            total=Count('pk')
+        ).order_by('-total', '-news')[:count]
+    )
+    news = News.objects.in_bulk(totals)
+    return [(news[news_id], total) for news_id, total in totals.items()]
+
+
+@pytest.mark.django_db
+def test_most_discussed(benchmark_report, make_dataset):
+    """Сравнивает рейтинг по часовым счётчикам с группировкой комментариев"""
+    make_dataset(users=1000, news=10000, comments=200000, days=30)
+    count = settings.NEWS_COUNT_ON_HOME_PAGE
+    for window, hours in settings.NEWS_RANKING_WINDOWS.items():
+        assert [
+            (news.pk, news.window_count)
+            for news in most_discussed(hours, count)
+        ] == [
+            (news.pk, total) for news, total in naive_most_discussed(
+                hours, count
+            )
+        ]
+        naive_time = best_time(lambda: naive_most_discussed(hours, count))
+        ranking_time = best_time(lambda: most_discussed(hours, count))
+        benchmark_report(
+            f'Самые обсуждаемые за {hours} ч, 200000 комментариев',
+            naive=f'{naive_time * 1000:.2f} мс',
+            ranking=f'{ranking_time * 1000:.2f} мс',
+        )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'news_count, comments_count', SEARCH_SIZES,
+    ids=[f'{news}-news' for news, _ in SEARCH_SIZES]
+)
+def test_search(benchmark_report, make_dataset, news_count, comments_count):
+    """Время первой и следующей страницы поиска по индексу слов"""
+    make_dataset(users=1000, news=news_count, comments=comments_count,
+                 batch_size=20000)
+    for index in range(RARE_NEWS_COUNT):
+        News.objects.create(title=f'Маяк {index}', text='Редкое слово')
+    results = {}
+    for query in SEARCH_QUERIES:
+        first_page = SearchPage(search_news(query))
+        first_time = best_time(
+            lambda: list(SearchPage(search_news(query)))
+        )
+        next_time = best_time(lambda: list(SearchPage(
+            search_news(query), cursor=first_page.next_cursor
+        )))
+        results[query] = (
+            f'{first_time * 1000:.1f} мс, '
+            f'следующая {next_time * 1000:.1f} мс'
+        )
+    benchmark_report(
+        f'Поиск: {news_count} новостей, {comments_count} комментариев',
+        **results
+    )
@@ -0,0 +1,97 @@
+from statistics import median
+from time import perf_counter
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+
+from news.models import Comment
+from news.pagination import CommentPage
+from news.profiling import SqlTimer
+from news.urls import app_name, urlpatterns
+
+pytestmark = pytest.mark.django_db
+
+REPEAT = 3
+
+
+def measure(client, url, params):
+    """Запросы, время SQL и медиана времени ответа, в мс."""
+    latencies = []
+    for _ in range(REPEAT):
+        timer = SqlTimer()
+        with connection.execute_wrapper(timer):
+            start = perf_counter()
+            client.get(url, params)
+            latencies.append((perf_counter() - start) * 1000)
+    return timer.count, timer.time * 1000, median(latencies)
+
+
+@pytest.fixture
+def url_args(author, large_dataset):
+    """Аргументы и параметры запроса каждой страницы news.urls."""
+    news_id = large_dataset.news_ids[0]
+    comment = Comment.objects.create(
+        news_id=news_id, author=author, text='Текст автора'
+    )
+    cursor = CommentPage(Comment.objects.filter(news_id=news_id)).next_cursor
+    return {
+        'home': ((), {}),
+        'detail': ((news_id,), {}),
+        'discussed': (('week',), {}),
+        'search': ((), {'q': 'нов парк'}),
+        'comments': ((news_id,), {'cursor': cursor}),
+        'edit': ((comment.pk,), {}),
+        'delete': ((comment.pk,), {}),
+        'cache_stats': ((), {}),
+        'profiling': ((), {}),
+    }
+
+
+def check_pages(subtests, client, url_args, check):
+    """
+    Замеряет каждую страницу news.urls и проверяет её в своём подтесте.
+
+    check(pattern, queries, sql_ms, latency_ms) вызывается внутри
+    подтеста, поэтому превышение бюджета одной страницы не прерывает
+    проверку остальных.
+    """
+    for pattern in urlpatterns:
+        with subtests.test(url=pattern.name):
+            assert hasattr(pattern, 'budget'), 'Не задан бюджет страницы'
+            assert pattern.name in url_args, 'Не заданы параметры страницы'
+            args, params = url_args[pattern.name]
+            url = reverse(f'{app_name}:{pattern.name}', args=args)
+            check(pattern, *measure(client, url, params))
+
+
+def test_url_query_budgets(subtests, author_client, url_args):
+    """
+    Проверяет число запросов всех страниц news.urls на большом наборе
+
+    Бюджет объявляется рядом с маршрутом через news.budgets.budget.
+    """
+    def check(pattern, queries, sql_ms, latency_ms):
+        assert queries <= pattern.budget.queries
+
+    check_pages(subtests, author_client, url_args, check)
+
+
+@pytest.mark.benchmark
+def test_url_latency_budgets(subtests,
+                             author_client,
+                             url_args,
+                             benchmark_report):
+    """Проверяет время ответа всех страниц news.urls на большом наборе"""
+    results = {}
+
+    def check(pattern, queries, sql_ms, latency_ms):
+        results[pattern.name] = (
+            f'{queries} запросов ({pattern.budget.queries}), '
+            f'SQL {sql_ms:.1f} мс, ответ {latency_ms:.1f} мс '
+            f'({pattern.budget.ms})'
+        )
+        assert latency_ms <= pattern.budget.ms
+
+    check_pages(subtests, author_client, url_args, check)
+    benchmark_report('Бюджеты страниц YaNews', **results)
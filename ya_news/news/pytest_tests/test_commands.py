@@ -0,0 +1,180 @@
+import json
+from datetime import date
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils.timezone import localtime
+
+from news.models import Comment, News, SearchTerm
+from news.search import search_news
+
+pytestmark = pytest.mark.django_db
+
+RSS = '''<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0">
+  <channel>
+    <title>Лента</title>
+    <item>
+      <title>Новость ленты</title>
+      <description>Текст новости ленты</description>
+      <pubDate>Tue, 01 Nov 2022 10:00:00 +0300</pubDate>
+    </item>
+    <item>
+      <title>Заголовок</title>
+      <description>Текст заметки</description>
+    </item>
+  </channel>
+</rss>
+'''
+
+
+def test_ingest_jsonl_skips_duplicates(news, tmp_path):
+    """Тестирует, что повторы в ленте и в базе не добавляются"""
+    rows = (
+        {'title': news.title, 'text': f'  {news.text} '},
+        {'title': 'Новая', 'text': 'Текст новой', 'date': '2022-11-01'},
+        {'title': 'Новая ', 'text': 'Текст  новой'},
+        {'title': 'Другая', 'text': 'Текст другой'},
+    )
+    path = tmp_path / 'feed.jsonl'
+    path.write_text(
+        ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows),
+        encoding='utf-8'
+    )
+    last_id = News.objects.latest('id').pk
+    call_command('ingest_news', path, batch_size=2, stdout=StringIO())
+    assert sorted(News.objects.filter(
+        id__gt=last_id
+    ).values_list('title', flat=True)) == ['Другая', 'Новая']
+    assert News.objects.get(title='Новая').date == date(2022, 11, 1)
+    assert [news_id for news_id, *_ in search_news('другая')] == [
+        News.objects.get(title='Другая').pk
+    ]
+
+
+def test_ingest_rss(news, tmp_path):
+    """Тестирует загрузку новостей из RSS"""
+    path = tmp_path / 'feed.rss'
+    path.write_text(RSS, encoding='utf-8')
+    news_count = News.objects.count()
+    call_command('ingest_news', path, stdout=StringIO())
+    assert News.objects.count() == news_count + 1
+    feed_news = News.objects.get(title='Новость ленты')
+    assert feed_news.text == 'Текст новости ленты'
+    assert feed_news.date == date(2022, 11, 1)
+
+
+def test_ingest_skips_invalid(news, tmp_path):
+    """Тестирует, что некорректные новости пропускаются, а не прерывают"""
+    path = tmp_path / 'feed.rss'
+    path.write_text(RSS.replace(
+        '<item>',
+        '<item><title>Без даты</title><pubDate>вчера</pubDate></item><item>',
+        1
+    ), encoding='utf-8')
+    news_count = News.objects.count()
+    stdout, stderr = StringIO(), StringIO()
+    call_command('ingest_news', path, stdout=stdout, stderr=stderr)
+    assert News.objects.count() == news_count + 1
+    assert News.objects.filter(title='Новость ленты').exists()
+    assert 'Без даты' in stderr.getvalue()
+    assert 'некорректных 1' in stdout.getvalue()
+
+
+def test_ingest_skips_broken_json(tmp_path):
+    """Тестирует, что неразобранная строка JSON не прерывает загрузку"""
+    path = tmp_path / 'feed.jsonl'
+    path.write_text(
+        '{"title": "Первая", "text": "Текст"}\n'
+        '{"title": "Обрыв\n'
+        '{"title": "Вторая", "text": "Текст"}\n',
+        encoding='utf-8'
+    )
+    stdout, stderr = StringIO(), StringIO()
+    call_command('ingest_news', path, stdout=stdout, stderr=stderr)
+    assert News.objects.filter(title__in=('Первая', 'Вторая')).count() == 2
+    assert 'строка 2' in stderr.getvalue()
+    assert 'некорректных 1' in stdout.getvalue()
+
+
+def test_ingest_broken_rss(tmp_path):
+    """Тестирует, что сломанный RSS загружается до места ошибки"""
+    path = tmp_path / 'feed.rss'
+    path.write_text(
+        RSS.replace('</channel>', '<item><title>Обрыв</item></channel>'),
+        encoding='utf-8'
+    )
+    stdout, stderr = StringIO(), StringIO()
+    call_command('ingest_news', path, stdout=stdout, stderr=stderr)
+    assert News.objects.filter(title='Новость ленты').exists()
+    assert 'строка 14' in stderr.getvalue()
+    assert 'некорректных 1' in stdout.getvalue()
+
+
+def test_ingest_csv(tmp_path):
+    """Тестирует загрузку новостей из CSV"""
+    path = tmp_path / 'feed.csv'
+    path.write_text(
+        'title,text,date\nНовость,"Текст, с запятой",2022-10-01\n',
+        encoding='utf-8'
+    )
+    call_command('ingest_news', path, stdout=StringIO())
+    news = News.objects.get(title='Новость')
+    assert news.text == 'Текст, с запятой'
+    assert news.content_hash == News.get_content_hash(news.title, news.text)
+
+
+def test_generate_news_data(django_user_model):
+    """Тестирует генерацию синтетических данных"""
+    users_count = django_user_model.objects.count()
+    news_count = News.objects.count()
+    comments_count = Comment.objects.count()
+    last_term_id = SearchTerm.objects.latest('id').pk
+    call_command(
+        'generate_news_data', users=10, news=50, comments=1000,
+        batch_size=300, stdout=StringIO()
+    )
+    assert django_user_model.objects.count() == users_count + 10
+    assert News.objects.count() == news_count + 50
+    assert Comment.objects.count() == comments_count + 1000
+    for news in News.objects.all():
+        assert news.content_hash == News.get_content_hash(
+            news.title, news.text
+        )
+    comment = Comment.objects.select_related('news').first()
+    assert localtime(comment.created).date() >= comment.news.date
+    assert sum(
+        News.objects.values_list('comment_count', flat=True)
+    ) == comments_count + 1000
+    new_terms = SearchTerm.objects.filter(id__gt=last_term_id)
+    assert new_terms.filter(comment=None).count() >= 50 * 3
+    assert new_terms.values('comment').distinct().count() == 1001
+
+
+def test_make_dataset_skewed(make_dataset):
+    """Тестирует, что комментарии сосредоточены у популярных новостей"""
+    dataset = make_dataset(users=10, news=100, comments=2000)
+    counts = [
+        Comment.objects.filter(news_id=news_id).count()
+        for news_id in dataset.news_ids
+    ]
+    assert counts[0] > counts[-1]
+    assert counts[0] > 2000 / 100
+
+
+def test_recount_comments(comments_list, news_list):
+    """Тестирует исправление расходящихся счётчиков комментариев"""
+    News.objects.update(comment_count=7)
+    stdout = StringIO()
+    call_command('recount_comments', batch_size=3, stdout=stdout)
+    news_count = News.objects.count()
+    assert f'Проверено {news_count} новостей, исправлено {news_count}' in (
+        stdout.getvalue()
+    )
+    news = comments_list[0].news
+    news.refresh_from_db()
+    assert news.comment_count == len(comments_list)
+    assert not News.objects.exclude(
+        pk=news.pk
+    ).exclude(comment_count=0).exists()
@@ -1,8 +1,21 @@
+from asyncio import iscoroutinefunction
+from datetime import datetime, timedelta
+from http import HTTPStatus
+
 import pytest
 
 from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
 
+from news.fake_data import explicit_created
 from news.forms import CommentForm
+from news.models import Comment, News
+from news.profiling import stats
+from .conftest import ASYNC_URLCONF, COMMENTS_PER_NEWS
 
 pytestmark = pytest.mark.django_db
 
@@ -22,6 +35,64 @@ def test_news_order(client, news_list, home_url):
     assert dates == sorted_dates
 
 
+def test_news_order_with_comments(client, news_list_comments, home_url):
+    """Тест, что новости с комментариями выводятся от новых к старым"""
+    response = client.get(home_url)
+    dates = [news.date for news in response.context['object_list']]
+    assert dates == sorted(
+        News.objects.values_list('date', flat=True), reverse=True
+    )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+
+
+def test_home_page_comment_count(client,
+                                 news,
+                                 comments_list,
+                                 news_list_comments,
+                                 home_url):
+    """Тест количества комментариев, выводимого на главной странице"""
+    seeded = {news.pk: len(comments_list)}
+    response = client.get(home_url)
+    for item in response.context['object_list']:
+        assert item.comment_count == (
+            COMMENTS_PER_NEWS + seeded.get(item.pk, 0)
+        )
+
+
+@pytest.mark.parametrize(
+    'comments_fixture',
+    ('news_list', 'news_list_comments')
+)
+def test_home_page_queries_count(
+        request,
+        client,
+        django_assert_num_queries,
+        home_url,
+        comments_fixture
+):
+    """
+    Тест, что число запросов главной страницы
+    не зависит от количества комментариев
+    """
+    request.getfixturevalue(comments_fixture)
+    with django_assert_num_queries(1):
+        client.get(home_url)
+
+
+def test_news_order_by_date_not_insertion(client, home_url):
+    """Тест сортировки новостей, добавленных в порядке возрастания даты"""
+    today = datetime.today()
+    News.objects.bulk_create(
+        News(title=f'Новость {index}',
+             text='Просто текст.',
+             date=today - timedelta(days=index))
+        for index in reversed(range(settings.NEWS_COUNT_ON_HOME_PAGE + 1))
+    )
+    response = client.get(home_url)
+    dates = [news.date for news in response.context['object_list']]
+    assert dates[0] == today.date()
+    assert dates == sorted(dates, reverse=True)
+
+
 def test_anon_client_no_form(client, detail_url):
     """Тест, что аноним не имеет формы новости"""
     response = client.get(detail_url)
@@ -49,3 +120,241 @@ def test_comment_order(client,
     comment = list(news_instance.comment_set.all())
     sorted_comments = sorted(comment, key=lambda comment: comment.created)
     assert comment == sorted_comments
+
+
+def test_comments_keyset_pages(client,
+                               settings,
+                               comments_list,
+                               detail_url,
+                               comments_url):
+    """Тест постраничного вывода комментариев по курсору"""
+    settings.COMMENTS_COUNT_ON_PAGE = 1
+    first_page = client.get(detail_url).context['comments']
+    assert list(first_page) == comments_list[:1]
+    assert first_page.has_next
+    response = client.get(
+        comments_url, {'cursor': first_page.next_cursor}
+    )
+    second_page = response.context['comments']
+    assert list(second_page) == comments_list[1:]
+    assert not second_page.has_next
+
+
+def test_comments_page_queries_count(client,
+                                     settings,
+                                     django_assert_num_queries,
+                                     news_list_comments,
+                                     detail_url,
+                                     comments_url):
+    """Тест, что страница комментариев стоит один запрос"""
+    settings.COMMENTS_COUNT_ON_PAGE = COMMENTS_PER_NEWS // 5
+    cursor = client.get(detail_url).context['comments'].next_cursor
+    with django_assert_num_queries(1):
+        client.get(comments_url, {'cursor': cursor})
+
+
+@pytest.mark.parametrize(
+    'cursor', ('abc', '1-2-3', f'{"9" * 30}-1', f'1-{"9" * 30}', '-1-1')
+)
+def test_comments_bad_cursor(client, comments_url, cursor):
+    """Тест, что некорректный курсор возвращает 404"""
+    response = client.get(comments_url, {'cursor': cursor})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_comments_missing_news(client, news):
+    """Тест, что комментарии несуществующей новости - это 404"""
+    response = client.get(reverse('news:comments', args=(news.pk + 1000,)))
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_most_discussed(client, author, news, comments_list, news_list):
+    """Тест рейтингов самых обсуждаемых новостей за сутки и неделю"""
+    now = timezone.now()
+    comments_by_age = (
+        (news_list[0], 3, timedelta()),
+        (news_list[1], 5, timedelta(days=3)),
+        (news_list[2], 1, timedelta()),
+        (news_list[3], 2, timedelta(days=30)),
+    )
+    with explicit_created():
+        for news_item, count, age in comments_by_age:
+            for _ in range(count):
+                Comment.objects.create(
+                    news=news_item, author=author, text='Текст',
+                    created=now - age
+                )
+    seeded = (news.pk, len(comments_list))
+    expected = {
+        'day': [(news_list[0].pk, 3), seeded, (news_list[2].pk, 1)],
+        'week': [(news_list[1].pk, 5), (news_list[0].pk, 3), seeded,
+                 (news_list[2].pk, 1)],
+    }
+    for window, ranking in expected.items():
+        response = client.get(reverse('news:discussed', args=(window,)))
+        assert [
+            (news.pk, news.window_count)
+            for news in response.context['object_list']
+        ] == ranking
+
+
+def test_most_discussed_unknown_window(client):
+    """Тест, что неизвестное окно рейтинга - это 404"""
+    response = client.get(reverse('news:discussed', args=('year',)))
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_search_ranked(client, author, search_url):
+    """Тест поиска по префиксам слов новостей и комментариев"""
+    in_title = News.objects.create(
+        title='Ёлка на площади', text='Праздник в городе'
+    )
+    in_text = News.objects.create(
+        title='Праздник', text='На площади поставили ёлку'
+    )
+    in_comment = News.objects.create(title='Площадь', text='Ремонт')
+    Comment.objects.create(
+        news=in_comment, author=author, text='Где теперь ёлка?'
+    )
+    News.objects.create(title='Ёлка', text='В лесу')
+    searches = (
+        ('ЕЛК площад', [in_title, in_comment, in_text]),
+        ('ёлку площади', [in_text]),
+        ('праздник', [in_text, in_title]),
+        ('площадь ремонт', [in_comment]),
+        ('', []),
+        ('!!!', []),
+    )
+    for query, expected in searches:
+        response = client.get(search_url, {'q': query})
+        assert list(response.context['object_list']) == expected, query
+
+
+def test_search_keyset_pages(client, settings, author, search_url):
+    """Тест постраничного вывода результатов поиска по курсору"""
+    settings.NEWS_SEARCH_COUNT_ON_PAGE = 2
+    news_list = [
+        News.objects.create(title=f'Новость {index}', text='Событие ' * weight)
+        for index, weight in enumerate((1, 2, 2, 2, 3))
+    ]
+    expected = [news_list[index].pk for index in (4, 3, 2, 1, 0)]
+    ids = []
+    params = {'q': 'событ'}
+    while True:
+        page = client.get(search_url, params).context['object_list']
+        ids += [news.pk for news in page]
+        if not page.next_cursor:
+            break
+        params['cursor'] = page.next_cursor
+    assert ids == expected
+
+
+@pytest.mark.parametrize('cursor', ('abc', '1-2-3', f'{"9" * 30}-1'))
+def test_search_bad_cursor(client, search_url, cursor):
+    """Тест, что некорректный курсор поиска возвращает 404"""
+    response = client.get(search_url, {'q': 'текст', 'cursor': cursor})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_detail_cached_for_anon(client, comments_list, detail_url):
+    """Тест, что повторный запрос анонима не обращается к комментариям"""
+    client.get(detail_url)
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(detail_url)
+    assert not any(
+        Comment._meta.db_table in query['sql']
+        for query in context.captured_queries
+    )
+    assert comments_list[0].text in response.content.decode()
+
+
+def test_home_page_cached_for_anon(client,
+                                   settings,
+                                   django_assert_num_queries,
+                                   news_list,
+                                   home_url,
+                                   cache_stats_url):
+    """Тест кэширования главной страницы для анонима"""
+    settings.NEWS_HOME_CACHE_ENABLED = True
+    first_response = client.get(home_url)
+    with django_assert_num_queries(0):
+        second_response = client.get(home_url)
+    assert second_response.content == first_response.content
+    stats = client.get(cache_stats_url).json()
+    assert stats == {'hits': 1, 'misses': 1}
+
+
+def test_home_page_not_cached_for_user(author_client,
+                                       settings,
+                                       news_list,
+                                       home_url,
+                                       cache_stats_url):
+    """Тест, что главная страница пользователя не кэшируется"""
+    settings.NEWS_HOME_CACHE_ENABLED = True
+    author_client.get(home_url)
+    response = author_client.get(home_url)
+    assert 'object_list' in response.context
+    stats = author_client.get(cache_stats_url).json()
+    assert stats == {'hits': 0, 'misses': 0}
+
+
+def test_profiling(client,
+                   admin_client,
+                   settings,
+                   news_list,
+                   home_url,
+                   profiling_url):
+    """Тест замеров страниц и их сводки для персонала"""
+    settings.PROFILING_ENABLED = True
+    stats.clear()
+    response = client.get(home_url)
+    timing = response['Server-Timing']
+    for metric in ('sql;dur=', 'desc="1 queries"', 'template;dur=',
+                   'total;dur='):
+        assert metric in timing
+    summary = admin_client.get(profiling_url).json()
+    assert summary['news:home']['count'] == 1
+    assert summary['news:home']['queries']['p50'] == 1
+    assert summary['news:home']['template']['p99'] > 0
+
+
+@pytest.mark.parametrize('url_fixture', ('home_url', 'detail_url'))
+def test_async_views_same_content(request,
+                                  client,
+                                  comments_list,
+                                  news_list,
+                                  url_fixture):
+    """Тест, что асинхронные страницы совпадают с синхронными"""
+    url = request.getfixturevalue(url_fixture)
+    expected = client.get(url).content
+    cache.clear()
+    request.getfixturevalue('async_views')
+    assert iscoroutinefunction(resolve(url).func)
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert response.content == expected
+
+
+def test_async_detail_for_user(author_client,
+                               async_views,
+                               comments_list,
+                               detail_url):
+    """Тест асинхронной страницы новости для пользователя"""
+    content = author_client.get(detail_url).content.decode()
+    assert 'csrfmiddlewaretoken' in content
+    assert comments_list[0].text in content
+
+
+def test_async_detail_not_found(client, async_views):
+    """Тест, что асинхронная страница несуществующей новости - это 404"""
+    response = client.get(reverse('news:detail', args=(0,)))
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.parametrize('urlconf', ('yanews.urls', ASYNC_URLCONF))
+def test_home_only_get(client, settings, home_url, urlconf):
+    """Тест, что главная в обоих режимах отвечает только на GET"""
+    settings.ROOT_URLCONF = urlconf
+    assert client.head(home_url).status_code == HTTPStatus.OK
+    response = client.post(home_url)
+    assert response.status_code == HTTPStatus.METHOD_NOT_ALLOWED
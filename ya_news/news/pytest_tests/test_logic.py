@@ -1,14 +1,28 @@
+import runpy
+from datetime import timedelta
 from http import HTTPStatus
 
 import pytest
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db import IntegrityError, connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 from pytest_django.asserts import assertFormError, assertRedirects
 
+from news.counters import most_discussed, window_start
 from news.forms import BAD_WORDS, WARNING
-from news.models import Comment
+from news.models import Comment, CommentHour, News
+from news.profanity import WordMatcher
+from news.search import search_news
+from yanews import settings as project_settings
+from .conftest import login_client
 
 pytestmark = pytest.mark.django_db
 
 FORM_DATA = {'text': 'Новый комментарий'}
+# Запросов к таблице сессий на страницу вошедшего пользователя.
+SESSION_QUERIES = {'db': 1, 'cached_db': 0, 'signed_cookies': 0}
 
 
 def test_anon_cant_comment(client, detail_url):
@@ -29,7 +43,6 @@ def test_auth_user_can_comment(
     Тестирует, что зарегестрированный
     пользователь может оставить комментарий
     """
-    Comment.objects.all().delete()
     comments_count = Comment.objects.count()
     response = author_client.post(
         detail_url,
@@ -38,10 +51,169 @@ def test_auth_user_can_comment(
     assertRedirects(response, f'{detail_url}#comments')
     comment_count = Comment.objects.count()
     assert comment_count == comments_count + 1
-    comment = Comment.objects.get()
-    assert comment.text == FORM_DATA['text']
+    comment = Comment.objects.get(text=FORM_DATA['text'])
     assert comment.news == news
     assert comment.author == author
+    stored_count = news.comment_count
+    news.refresh_from_db()
+    assert news.comment_count == stored_count + 1
+
+
+def test_async_detail_comment(author_client, async_views, detail_url):
+    """Тестирует комментарий через асинхронную страницу новости"""
+    Comment.objects.all().delete()
+    response = author_client.post(detail_url, data=FORM_DATA)
+    assertRedirects(response, f'{detail_url}#comments')
+    assert Comment.objects.get().text == FORM_DATA['text']
+
+
+def test_comment_count_follows_orm_comments(author_client,
+                                            news,
+                                            author,
+                                            django_user_model):
+    """Тестирует счётчик с комментариями, созданными не через сайт"""
+    stored_count = news.comment_count
+    comment = Comment.objects.create(news=news, author=author, text='Текст')
+    news.refresh_from_db()
+    assert news.comment_count == stored_count + 1
+    author_client.delete(reverse('news:delete', args=(comment.pk,)))
+    news.refresh_from_db()
+    assert news.comment_count == stored_count
+    reader = django_user_model.objects.create(username='Читатель')
+    Comment.objects.create(news=news, author=reader, text='Текст')
+    reader.delete()
+    news.refresh_from_db()
+    assert news.comment_count == stored_count
+
+
+def test_delete_uncounted_comment(author_client, news_list, author):
+    """Тестирует удаление комментария, не попавшего в счётчик"""
+    news = news_list[0]
+    Comment.objects.bulk_create(
+        (Comment(news=news, author=author, text='Текст'),)
+    )
+    comment = Comment.objects.latest('id')
+    response = author_client.delete(
+        reverse('news:delete', args=(comment.pk,))
+    )
+    assert response.status_code == HTTPStatus.FOUND
+    news.refresh_from_db()
+    assert news.comment_count == 0
+
+
+def test_comment_hours_follow_orm_comments(author_client,
+                                           news_list,
+                                           author,
+                                           django_user_model):
+    """Тестирует часовые счётчики с комментариями не через сайт"""
+    news = news_list[0]
+    counted = Comment.objects.create(news=news, author=author, text='Текст')
+    reader = django_user_model.objects.create(username='Читатель')
+    Comment.objects.create(news=news, author=reader, text='Текст')
+    assert {
+        item.pk: item.window_count for item in most_discussed(24, 10)
+    }[news.pk] == 2
+    reader.delete()
+    Comment.objects.bulk_create(
+        (Comment(news=news, author=author, text='Без счётчика'),)
+    )
+    for comment in (counted, Comment.objects.latest('id')):
+        response = author_client.delete(
+            reverse('news:delete', args=(comment.pk,))
+        )
+        assert response.status_code == HTTPStatus.FOUND
+    assert news.comment_hours.get().count == 0
+    assert news.pk not in [item.pk for item in most_discussed(24, 10)]
+
+
+def test_old_comment_hours_pruned(settings, news_list, author):
+    """Тестирует, что новый час удаляет счётчики старше окон рейтинга"""
+    news = news_list[0]
+    since = window_start(max(settings.NEWS_RANKING_WINDOWS.values()))
+    old, kept = (
+        CommentHour.objects.create(news=news, hour=hour, count=1)
+        for hour in (since - timedelta(hours=1), since)
+    )
+    Comment.objects.create(news=news, author=author, text='Текст')
+    assert not CommentHour.objects.filter(pk=old.pk).exists()
+    assert CommentHour.objects.filter(pk=kept.pk).exists()
+
+
+@pytest.mark.parametrize('comments_count', (1, 20))
+def test_cascade_delete_queries_count(django_assert_num_queries,
+                                      news_list,
+                                      author,
+                                      django_user_model,
+                                      comments_count):
+    """Тестирует, что каскадное удаление не считает комментарии по одному"""
+    reader = django_user_model.objects.create(username='Читатель')
+    for news in news_list[:2]:
+        for _ in range(comments_count):
+            for user in (author, reader):
+                Comment.objects.create(news=news, author=user, text='Текст')
+    # Комментарии, затем поисковые слова, часовые счётчики и сами записи.
+    with django_assert_num_queries(6):
+        news_list[0].delete()
+    # Ещё по UPDATE счётчиков новостей и часов, связи пользователя.
+    with django_assert_num_queries(9):
+        author.delete()
+    news = news_list[1]
+    news.refresh_from_db()
+    assert news.comment_count == comments_count
+    assert news.comment_hours.get().count == comments_count
+
+
+def test_most_discussed_follows_comments(author_client,
+                                         discussed_url,
+                                         detail_url,
+                                         delete_url,
+                                         comments_list,
+                                         comment):
+    """Тестирует, что рейтинг меняется с добавлением и удалением"""
+    def window_counts():
+        ranking = author_client.get(discussed_url).context['object_list']
+        return [news.window_count for news in ranking]
+
+    seeded = len(comments_list)
+    author_client.post(detail_url, data=FORM_DATA)
+    assert window_counts() == [seeded + 2]
+    author_client.delete(delete_url)
+    assert window_counts() == [seeded + 1]
+    author_client.delete(reverse(
+        'news:delete', args=(Comment.objects.get(text=FORM_DATA['text']).pk,)
+    ))
+    assert window_counts() == [seeded]
+
+
+def test_search_index_follows_changes(author_client,
+                                      news,
+                                      comment,
+                                      edit_url,
+                                      delete_url):
+    """Тестирует, что поиск видит правки новости и комментария"""
+    def found(query):
+        return [news_id for news_id, *_ in search_news(query)]
+
+    assert found('комментария') == [news.pk]
+    author_client.post(edit_url, data=FORM_DATA)
+    assert found('комментария') == []
+    assert found('новый') == [news.pk]
+    author_client.delete(delete_url)
+    assert found('новый') == []
+    news.title = 'Другой заголовок'
+    news.save()
+    assert found('заголовок другой') == [news.pk]
+    news.delete()
+    assert found('заголовок') == []
+
+
+def test_news_content_unique(news):
+    """Тестирует, что новость с тем же содержимым не добавить"""
+    duplicate = News(title=news.title, text=f' {news.text} ')
+    with pytest.raises(ValidationError):
+        duplicate.full_clean()
+    with pytest.raises(IntegrityError):
+        duplicate.save()
 
 
 def test_cant_use_bad_words(author_client, detail_url):
@@ -57,6 +229,44 @@ def test_cant_use_bad_words(author_client, detail_url):
     assert comments_count == comment_count
 
 
+def test_cant_use_bad_words_from_file(
+        author_client,
+        detail_url,
+        settings,
+        tmp_path
+):
+    """Тестирует, что учитываются плохие слова из файла настроек"""
+    words_file = tmp_path / 'bad_words.txt'
+    words_file.write_text('злодей\nплут\n', encoding='utf-8')
+    settings.BAD_WORDS_FILE = words_file
+    comments_count = Comment.objects.count()
+    response = author_client.post(detail_url, data={'text': 'Ну и ПЛУТ!'})
+    assertFormError(response,
+                    form='form',
+                    field='text',
+                    errors=WARNING)
+    assert Comment.objects.count() == comments_count
+
+
+@pytest.mark.parametrize(
+    'text, expected',
+    (
+        ('ushers', True),
+        ('hishe', True),
+        ('ahis', True),
+        ('hhe', True),
+        ('sh', False),
+        ('hi', False),
+        ('', False),
+    )
+)
+def test_word_matcher(text, expected):
+    """Тестирует автомат на пересекающихся словах"""
+    words = ('he', 'she', 'his', 'hers')
+    assert WordMatcher(words).search(text) is expected
+    assert any(word in text for word in words) is expected
+
+
 def test_auth_can_delete_comment(
         author_client,
         delete_url,
@@ -65,12 +275,15 @@ def test_auth_can_delete_comment(
 ):
     """Тестирует, что автор комментария может его удалить"""
     comments_count = Comment.objects.count()
+    stored_count = comment.news.comment_count
     response = author_client.delete(delete_url)
     assertRedirects(response, url_to_comments)
     with pytest.raises(Comment.DoesNotExist):
         Comment.objects.get(pk=comment.pk)
     comment_count = Comment.objects.count()
     assert comment_count == comments_count - 1
+    comment.news.refresh_from_db()
+    assert comment.news.comment_count == stored_count - 1
 
 
 def test_auth_can_edit_comment(
@@ -93,6 +306,46 @@ def test_auth_can_edit_comment(
     assert comments_count == comment_count
 
 
+@pytest.mark.parametrize(
+    'method, url_fixture, expected_status, expected_queries',
+    (
+        # Сессия, пользователь, новость и в одной транзакции
+        # INSERT комментария и его слов, UPDATE счётчиков: SAVEPOINT
+        # и RELEASE в тестах. Часовой счётчик уже создан фикстурой
+        # comment, иначе добавились бы SAVEPOINT, INSERT и RELEASE.
+        ('post', 'detail_url', HTTPStatus.FOUND, 9),
+        # Сессия, пользователь, комментарий с новостью, UPDATE
+        # и в транзакции DELETE и INSERT слов комментария.
+        ('post', 'edit_url', HTTPStatus.FOUND, 8),
+        # Сессия, пользователь, комментарий с новостью и в транзакции
+        # удаления DELETE слов и комментария, UPDATE счётчиков
+        # сигналом. Внутри транзакции теста удаление без SAVEPOINT.
+        ('delete', 'delete_url', HTTPStatus.FOUND, 7),
+        # Страницы подтверждения: сессия, пользователь, комментарий.
+        ('get', 'edit_url', HTTPStatus.OK, 3),
+        ('get', 'delete_url', HTTPStatus.OK, 3),
+    )
+)
+def test_comment_write_queries_count(
+        request,
+        author_client,
+        django_assert_num_queries,
+        comment,
+        method,
+        url_fixture,
+        expected_status,
+        expected_queries
+):
+    """Тестирует число запросов при работе с комментарием"""
+    url = request.getfixturevalue(url_fixture)
+    with django_assert_num_queries(expected_queries):
+        if method == 'post':
+            response = author_client.post(url, data=FORM_DATA)
+        else:
+            response = getattr(author_client, method)(url)
+    assert response.status_code == expected_status
+
+
 def test_user_cant_delete_comment_another_user(
         admin_client,
         delete_url,
@@ -134,3 +387,95 @@ def test_user_cant_edit_comment_another_user(
     assert update.news == nws
     comment_count = Comment.objects.count()
     assert comments_count == comment_count
+
+
+def test_cache_invalidated_on_comment_create(
+        client,
+        author_client,
+        detail_url
+):
+    """Тестирует, что новый комментарий сразу виден анониму"""
+    client.get(detail_url)
+    author_client.post(detail_url, data=FORM_DATA)
+    response = client.get(detail_url)
+    assert FORM_DATA['text'] in response.content.decode()
+
+
+def test_cache_invalidated_on_comment_edit(
+        client,
+        author_client,
+        detail_url,
+        edit_url
+):
+    """Тестирует, что исправленный комментарий сразу виден анониму"""
+    client.get(detail_url)
+    author_client.post(edit_url, data=FORM_DATA)
+    response = client.get(detail_url)
+    assert FORM_DATA['text'] in response.content.decode()
+
+
+def test_cache_invalidated_on_comment_delete(
+        client,
+        author_client,
+        detail_url,
+        delete_url,
+        comment
+):
+    """Тестирует, что удалённый комментарий сразу пропадает у анонима"""
+    client.get(detail_url)
+    author_client.delete(delete_url)
+    response = client.get(detail_url)
+    assert comment.text not in response.content.decode()
+
+
+def test_home_cache_invalidated_on_comment_create(
+        client,
+        author_client,
+        settings,
+        comments_list,
+        home_url,
+        detail_url
+):
+    """Тестирует, что новый комментарий сбрасывает кэш главной"""
+    settings.NEWS_HOME_CACHE_ENABLED = True
+    client.get(home_url)
+    author_client.post(detail_url, data=FORM_DATA)
+    response = client.get(home_url)
+    assert f'Комментариев: {len(comments_list) + 1}' in (
+        response.content.decode()
+    )
+
+
+def test_session_modes(session_mode, author, login_url, logout_url,
+                       detail_url):
+    """Тестирует вход, страницы и выход с каждым хранилищем сессий"""
+    def log_in():
+        # Смена пароля сбрасывает прежние сессии, вход после неё.
+        author.set_password('password')
+        author.save()
+        client = Client()
+        response = client.post(
+            login_url, {'username': author.username, 'password': 'password'}
+        )
+        assertRedirects(response, reverse('news:home'))
+        return client
+
+    for make_client in (lambda: login_client(author), log_in):
+        client = make_client()
+        client.get(detail_url)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(detail_url)
+        assert response.context['user'] == author
+        assert sum(
+            'django_session' in query['sql']
+            for query in context.captured_queries
+        ) == SESSION_QUERIES[session_mode]
+        client.post(logout_url)
+        assert client.get(detail_url).context['user'].is_anonymous
+
+
+def test_unknown_session_mode(monkeypatch):
+    """Тестирует, что неизвестный режим сессий останавливает запуск"""
+    monkeypatch.setenv('SESSION_MODE', 'redis')
+    with pytest.raises(ImproperlyConfigured, match='signed_cookies'):
+        runpy.run_path(project_settings.__file__)
@@ -0,0 +1,55 @@
+import pytest
+from django.db import connection
+
+from news.search import search_news
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.mark.parametrize(
+    'url_fixture, client_fixture',
+    (
+        ('home_url', 'client'),
+        ('detail_url', 'client'),
+        ('detail_url', 'author_client'),
+        ('edit_url', 'author_client'),
+        ('delete_url', 'author_client'),
+    )
+)
+def test_hot_views_use_indexes(request,
+                               assert_uses_indexes,
+                               news_list_comments,
+                               comment,
+                               url_fixture,
+                               client_fixture):
+    """Проверяет, что запросы страниц идут по индексам"""
+    url = request.getfixturevalue(url_fixture)
+    client = request.getfixturevalue(client_fixture)
+    with assert_uses_indexes():
+        client.get(url)
+
+
+def test_comments_page_uses_indexes(client,
+                                    settings,
+                                    assert_uses_indexes,
+                                    news_list_comments,
+                                    detail_url,
+                                    comments_url):
+    """Проверяет, что страница комментариев по курсору идёт по индексу"""
+    settings.COMMENTS_COUNT_ON_PAGE = 10
+    cursor = client.get(detail_url).context['comments'].next_cursor
+    with assert_uses_indexes():
+        client.get(comments_url, {'cursor': cursor})
+
+
+def test_search_reads_only_term_index(news_list_comments):
+    """Проверяет, что поиск читает только покрывающий индекс слов"""
+    sql, params = search_news('текст нов').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        plan = [row[-1] for row in cursor.fetchall()]
+    searches = [step for step in plan if step.startswith('SEARCH')]
+    assert searches, plan
+    for step in searches:
+        assert 'USING COVERING INDEX search_term_idx' in step, plan
+    assert not any(step.startswith('SCAN') for step in plan), plan
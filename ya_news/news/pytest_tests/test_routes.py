@@ -12,6 +12,13 @@ pytestmark = pytest.mark.django_db
     (
         ('home_url', 'client', HTTPStatus.OK),
         ('detail_url', 'client', HTTPStatus.OK),
+        ('comments_url', 'client', HTTPStatus.OK),
+        ('discussed_url', 'client', HTTPStatus.OK),
+        ('search_url', 'client', HTTPStatus.OK),
+        ('cache_stats_url', 'client', HTTPStatus.OK),
+        ('profiling_url', 'client', HTTPStatus.FOUND),
+        ('profiling_url', 'admin_client', HTTPStatus.OK),
+        ('profiling_url', 'author_client', HTTPStatus.FORBIDDEN),
         ('login_url', 'client', HTTPStatus.OK),
         ('logout_url', 'client', HTTPStatus.OK),
         ('signup_url', 'client', HTTPStatus.OK),
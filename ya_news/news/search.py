@@ -0,0 +1,167 @@
+import re
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import Case, Count, IntegerField, Q, Sum, When
+
+from .models import Comment, News, SearchTerm
+
+TERM = re.compile(r'\w+')
+TERM_MAX_LENGTH = 50
+# Слово из заголовка новости весит как столько же слов из текста.
+TITLE_TERM_WEIGHT = 3
+
+
+def get_terms(text):
+    """Слова текста для поиска: в нижнем регистре, «ё» как «е»."""
+    return [
+        term[:TERM_MAX_LENGTH]
+        for term in TERM.findall(text.lower().replace('ё', 'е'))
+        if len(term) > 1
+    ]
+
+
+def get_term_weights(text, title=''):
+    """Вес каждого слова документа: число вхождений, в заголовке больше."""
+    weights = Counter(get_terms(text))
+    for term in get_terms(title):
+        weights[term] += TITLE_TERM_WEIGHT
+    return weights
+
+
+def get_prefixes(query):
+    """
+    Префиксы слов запроса.
+
+    Префикс, с которого начинается другое слово запроса, отбрасывается:
+    документ с более длинным словом подходит и под него.
+    """
+    terms = set(get_terms(query))
+    return sorted(
+        term for term in terms
+        if not any(other != term and other.startswith(term)
+                   for other in terms)
+    )
+
+
+def prefix_range(prefix):
+    """
+    Условие «слово начинается с prefix» диапазоном по индексу.
+
+    LIKE в SQLite не различает регистр кириллицы и не использует
+    индекс, поэтому верхняя граница - префикс с увеличенным
+    последним символом.
+    """
+    end = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return Q(term__gte=prefix, term__lt=end)
+
+
+def insert_terms(rows):
+    """Вставляет строки (news, comment, term, weight) одним executemany."""
+    if not rows:
+        return
+    quote_name = connection.ops.quote_name
+    columns = ', '.join(
+        quote_name(SearchTerm._meta.get_field(name).column)
+        for name in ('news', 'comment', 'term', 'weight')
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {quote_name(SearchTerm._meta.db_table)} '
+            f'({columns}) VALUES (%s, %s, %s, %s)',
+            rows
+        )
+
+
+def replace_terms(stale, rows):
+    """
+    Удаляет устаревшие слова stale и вставляет строки rows.
+
+    Для только что созданных документов stale - None: удалять
+    нечего, и единственный INSERT не нужно оборачивать в транзакцию.
+    """
+    if stale is None:
+        return insert_terms(rows)
+    with transaction.atomic():
+        stale.delete()
+        insert_terms(rows)
+
+
+def index_news(news_list, replace=True):
+    """
+    Пересобирает поисковый индекс сохранённых новостей.
+
+    С replace=False старые слова не удаляются, это для только что
+    созданных новостей. При удалении новости слова удаляет каскад.
+    """
+    replace_terms(
+        SearchTerm.objects.filter(
+            news__in=[news.pk for news in news_list], comment=None
+        ) if replace else None,
+        [
+            (news.pk, None, term, weight)
+            for news in news_list
+            for term, weight in get_term_weights(
+                news.text, news.title
+            ).items()
+        ]
+    )
+
+
+def index_comments(comments, replace=True):
+    """Пересобирает поисковый индекс сохранённых комментариев."""
+    replace_terms(
+        SearchTerm.objects.filter(
+            comment__in=[comment.pk for comment in comments]
+        ) if replace else None,
+        [
+            (comment.news_id, comment.pk, term, weight)
+            for comment in comments
+            for term, weight in get_term_weights(comment.text).items()
+        ]
+    )
+
+
+def index_new_documents(news_after=0, comments_after=0, batch_size=1000):
+    """
+    Индексирует пачками по id новости и комментарии после заданных id.
+
+    Нужна после bulk_create, который не отправляет post_save.
+    """
+    documents = (
+        (News.objects.only('title', 'text'), news_after, index_news),
+        (Comment.objects.only('news_id', 'text'), comments_after,
+         index_comments),
+    )
+    for queryset, last_id, index in documents:
+        while True:
+            batch = list(
+                queryset.filter(id__gt=last_id).order_by('id')[:batch_size]
+            )
+            if not batch:
+                break
+            index(batch, replace=False)
+            last_id = batch[-1].pk
+
+
+def search_news(query):
+    """
+    Id новостей, в тексте или комментариях которых есть все слова
+    запроса, с суммарным весом score.
+
+    Каждое слово запроса ищется как префикс. Запрос читает только
+    индекс (term, news, weight); сортировка - по убыванию веса,
+    затем от новых к старым, её использует курсор SearchPage.
+    """
+    prefixes = get_prefixes(query)
+    terms = Q(pk__in=())
+    for prefix in prefixes:
+        terms |= prefix_range(prefix)
+    word = Case(
+        *(When(prefix_range(prefix), then=index)
+          for index, prefix in enumerate(prefixes)),
+        output_field=IntegerField()
+    )
+    return SearchTerm.objects.filter(terms).values_list('news_id').annotate(
+        score=Sum('weight'), matched=Count(word, distinct=True)
+    ).filter(matched=len(prefixes)).order_by('-score', '-news_id')
@@ -0,0 +1,77 @@
+from django.conf import settings
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from .cache import bump_comments_version, bump_home_version
+from .counters import (
+    cascade_deletion, change_comment_count, uncount_author_comments
+)
+from .models import Comment, News
+from .search import index_comments, index_news
+
+
+@receiver((post_save, post_delete), sender=Comment)
+def comment_changed(instance, **kwargs):
+    bump_comments_version(instance.news_id)
+    bump_home_version()
+
+
+@receiver((post_save, post_delete), sender=News)
+def news_changed(instance, **kwargs):
+    bump_comments_version(instance.pk)
+    bump_home_version()
+
+
+@receiver(pre_save, sender=News)
+def fill_content_hash(instance, **kwargs):
+    instance.content_hash = News.get_content_hash(
+        instance.title, instance.text
+    )
+
+
+@receiver(post_save, sender=News)
+def index_saved_news(instance, created, **kwargs):
+    index_news((instance,), replace=not created)
+
+
+@receiver(post_save, sender=Comment)
+def index_saved_comment(instance, created, **kwargs):
+    index_comments((instance,), replace=not created)
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(instance, created, **kwargs):
+    """Счётчики новости видят комментарии, созданные где угодно."""
+    if created:
+        change_comment_count(instance, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(instance, **kwargs):
+    if not cascade_deletion.covers(instance):
+        change_comment_count(instance, -1)
+
+
+@receiver(pre_delete, sender=News)
+def start_news_deletion(instance, **kwargs):
+    """Счётчики новости удаляются с ней, комментарии не вычитаются."""
+    cascade_deletion.news.add(instance.pk)
+
+
+@receiver(post_delete, sender=News)
+def finish_news_deletion(instance, **kwargs):
+    cascade_deletion.news.discard(instance.pk)
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def start_author_deletion(instance, **kwargs):
+    """Комментарии автора вычитаются из счётчиков разом, до удаления."""
+    uncount_author_comments(instance.pk)
+    cascade_deletion.authors.add(instance.pk)
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def finish_author_deletion(instance, **kwargs):
+    cascade_deletion.authors.discard(instance.pk)
@@ -1,16 +1,69 @@
 from django.urls import path
 
-from news import views
+from news import profiling, views
+from news.budgets import budget
 
 app_name = 'news'
 
 urlpatterns = [
-    path('', views.NewsList.as_view(), name='home'),
-    path('news/<int:pk>/', views.NewsDetailView.as_view(), name='detail'),
-    path(
-        'delete_comment/<int:pk>/',
-        views.CommentDelete.as_view(),
-        name='delete'
-    ),
-    path('edit_comment/<int:pk>/', views.CommentUpdate.as_view(), name='edit'),
+    budget(
+        path('', views.NewsList.as_view(), name='home'),
+        queries=3, ms=200
+    ),
+    budget(
+        path('news/<int:pk>/', views.NewsDetail.as_view(), name='detail'),
+        queries=4, ms=200
+    ),
+    budget(
+        path(
+            'discussed/<str:window>/',
+            views.MostDiscussed.as_view(),
+            name='discussed'
+        ),
+        queries=4, ms=200
+    ),
+    budget(
+        path('search/', views.NewsSearch.as_view(), name='search'),
+        queries=4, ms=200
+    ),
+    budget(
+        path(
+            'news/<int:pk>/comments/',
+            views.NewsComments.as_view(),
+            name='comments'
+        ),
+        queries=3, ms=200
+    ),
+    budget(
+        path(
+            'delete_comment/<int:pk>/',
+            views.CommentDelete.as_view(),
+            name='delete'
+        ),
+        queries=4, ms=200
+    ),
+    budget(
+        path(
+            'edit_comment/<int:pk>/',
+            views.CommentUpdate.as_view(),
+            name='edit'
+        ),
+        queries=4, ms=200
+    ),
+    budget(
+        path(
+            'cache_stats/',
+            views.HomeCacheStats.as_view(),
+            name='cache_stats'
+        ),
+        queries=0, ms=50
+    ),
+    budget(
+        path(
+            'profiling/',
+            profiling.ProfilingStats.as_view(),
+            name='profiling'
+        ),
+        queries=2, ms=50
+    ),
 ]
@@ -1,11 +1,19 @@
 from django.conf import settings
-from django.contrib.auth.mixins import LoginRequiredMixin
-from django.shortcuts import get_object_or_404
+from django.contrib.auth.mixins import AccessMixin, LoginRequiredMixin
+from django.core.cache import cache
+from django.db import transaction
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import redirect
 from django.urls import reverse
 from django.views import generic
 
+from .cache import (count_home_cache, get_comments_version,
+                    get_home_cache_stats, get_home_page_key)
+from .counters import most_discussed
 from .forms import CommentForm
 from .models import Comment, News
+from .pagination import CommentPage, SearchPage
+from .search import search_news
 
 
 class NewsList(generic.ListView):
@@ -18,64 +26,157 @@ class NewsList(generic.ListView):
         Выводим только несколько последних новостей.
 
         Их количество определяется в настройках проекта.
+        Число комментариев хранится в самой новости, см. news.counters.
+        Сортировка задана явно: Meta.ordering не применяется к запросам
+        с группировкой, например с аннотацией Count.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
+        return self.model.objects.order_by(
+            '-date'
         )[:settings.NEWS_COUNT_ON_HOME_PAGE]
 
+    def get(self, request, *args, **kwargs):
+        """
+        Анонимам отдаём страницу целиком из кэша, если он включён.
 
-class NewsDetail(generic.DetailView):
-    model = News
-    template_name = 'news/detail.html'
+        Кэш сбрасывается при изменении новостей и комментариев
+        и устаревает через NEWS_HOME_CACHE_TIMEOUT секунд.
+        """
+        if (not settings.NEWS_HOME_CACHE_ENABLED
+                or request.user.is_authenticated):
+            return super().get(request, *args, **kwargs)
+        key = get_home_page_key()
+        content = cache.get(key)
+        if content is not None:
+            count_home_cache('hits')
+            return HttpResponse(content)
+        count_home_cache('misses')
+        response = super().get(request, *args, **kwargs)
+        response.add_post_render_callback(
+            lambda response: cache.set(
+                key, response.content, settings.NEWS_HOME_CACHE_TIMEOUT
+            )
+        )
+        return response
 
-    def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
+
+class MostDiscussed(generic.ListView):
+    """Самые обсуждаемые новости за окно из NEWS_RANKING_WINDOWS."""
+    template_name = 'news/discussed.html'
+
+    def get_queryset(self):
+        hours = settings.NEWS_RANKING_WINDOWS.get(self.kwargs['window'])
+        if hours is None:
+            raise Http404('Неизвестное окно рейтинга.')
+        return most_discussed(hours, settings.NEWS_COUNT_ON_HOME_PAGE)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['window'] = self.kwargs['window']
+        return context
+
+
+class NewsSearch(generic.ListView):
+    """
+    Поиск по новостям и комментариям к ним, см. news.search.
+
+    Страницы выбираются по курсору из предыдущей страницы.
+    """
+    template_name = 'news/search.html'
+
+    def get_queryset(self):
+        return SearchPage(
+            search_news(self.request.GET.get('q', '')),
+            cursor=self.request.GET.get('cursor')
         )
-        return obj
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        if self.request.user.is_authenticated:
-            context['form'] = CommentForm()
+        context['query'] = self.request.GET.get('q', '')
+        return context
+
+
+class HomeCacheStats(generic.View):
+    """Счётчики кэша главной страницы для сбора метрик."""
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(get_home_cache_stats())
+
+
+class NewsCommentsMixin:
+    """Первая страница комментариев новости в контексте."""
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['comments'] = CommentPage(
+            self.object.comment_set.select_related('author')
+        )
         return context
 
 
-class NewsComment(
-        LoginRequiredMixin,
-        generic.detail.SingleObjectMixin,
-        generic.FormView
-):
+class NewsDetail(AccessMixin, NewsCommentsMixin, generic.DetailView):
+    """
+    Страница новости и добавление комментария к ней.
+
+    GET и POST обслуживаются одним представлением с общим поиском
+    новости, комментировать могут только вошедшие пользователи.
+    """
     model = News
-    form_class = CommentForm
     template_name = 'news/detail.html'
 
     def post(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return self.handle_no_permission()
         self.object = self.get_object()
-        return super().post(request, *args, **kwargs)
-
-    def form_valid(self, form):
+        form = CommentForm(data=request.POST)
+        if not form.is_valid():
+            return self.render_to_response(self.get_context_data(form=form))
         comment = form.save(commit=False)
         comment.news = self.object
-        comment.author = self.request.user
-        comment.save()
-        return super().form_valid(form)
+        comment.author = request.user
+        # Комментарий, его слова и счётчики пишутся сигналами одной
+        # транзакцией, см. news.signals.
+        with transaction.atomic():
+            comment.save()
+        return redirect(self.get_success_url())
 
     def get_success_url(self):
-        post = self.get_object()
-        return reverse('news:detail', kwargs={'pk': post.pk}) + '#comments'
+        return reverse(
+            'news:detail', kwargs={'pk': self.object.pk}
+        ) + '#comments'
 
+    def get_context_data(self, form=None, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if self.request.user.is_authenticated:
+            context['form'] = form or CommentForm()
+        else:
+            context['fragment_timeout'] = settings.NEWS_FRAGMENT_CACHE_TIMEOUT
+            context['comments_version'] = get_comments_version(self.object.pk)
+        return context
 
-class NewsDetailView(generic.View):
 
-    def get(self, request, *args, **kwargs):
-        view = NewsDetail.as_view()
-        return view(request, *args, **kwargs)
+class NewsComments(generic.TemplateView):
+    """Следующая страница комментариев новости, начиная с курсора."""
+    template_name = 'news/includes/comments.html'
 
-    def post(self, request, *args, **kwargs):
-        view = NewsComment.as_view()
-        return view(request, *args, **kwargs)
+    def get_context_data(self, **kwargs):
+        """
+        Новость отдельно не загружается: её наличие проверяется
+        только для пустой страницы, у несуществующей новости она пуста.
+        """
+        context = super().get_context_data(**kwargs)
+        comments = CommentPage(
+            Comment.objects.filter(
+                news_id=self.kwargs['pk']
+            ).select_related('author'),
+            cursor=self.request.GET.get('cursor')
+        )
+        if not comments.object_list and not News.objects.filter(
+            pk=self.kwargs['pk']
+        ).exists():
+            raise Http404('Новость не найдена.')
+        context['news_pk'] = self.kwargs['pk']
+        context['comments'] = comments
+        return context
 
 
 class CommentBase(LoginRequiredMixin):
@@ -83,14 +184,19 @@ class CommentBase(LoginRequiredMixin):
     model = Comment
 
     def get_success_url(self):
-        comment = self.get_object()
+        """Комментарий уже загружен в self.object, новость не нужна."""
         return reverse(
-            'news:detail', kwargs={'pk': comment.news.pk}
+            'news:detail', kwargs={'pk': self.object.news_id}
         ) + '#comments'
 
     def get_queryset(self):
-        """Пользователь может работать только со своими комментариями."""
-        return self.model.objects.filter(author=self.request.user)
+        """
+        Пользователь может работать только со своими комментариями.
+        Заголовок новости нужен шаблонам, поэтому она выбирается сразу.
+        """
+        return self.model.objects.filter(
+            author=self.request.user
+        ).select_related('news')
 
 
 class CommentUpdate(CommentBase, generic.UpdateView):
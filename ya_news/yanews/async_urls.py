@@ -0,0 +1,9 @@
+"""Маршруты проекта с news.async_urls вместо news.urls, для ASGI."""
+from django.urls import include, path
+
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [path('', include('news.async_urls'))] + [
+    pattern for pattern in sync_urlpatterns
+    if getattr(pattern, 'app_name', None) != 'news'
+]
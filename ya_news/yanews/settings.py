@@ -1,5 +1,7 @@
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
 from django.urls import reverse_lazy
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -21,6 +23,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'news.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -30,6 +33,8 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Под ASGI - 'yanews.async_urls' с асинхронными главной и страницей
+# новости, см. news.async_views.
 ROOT_URLCONF = 'yanews.urls'
 
 TEMPLATES = [
@@ -58,6 +63,34 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yanews',
+    }
+}
+
+# Сессии YaNews, режим задаёт переменная окружения SESSION_MODE. По
+# умолчанию 'db': строка сессии читается на каждом запросе вошедшего.
+# 'cached_db' читает сессии из кэша 'default' выше, а в базу только
+# пишет. Кэш в памяти процесса годится для одного процесса; с
+# несколькими нужен общий кэш, иначе вышедший пользователь останется
+# вошедшим в других процессах. 'signed_cookies' хранит сессию в cookie,
+# подписанной SECRET_KEY: пользователь видит её содержимое, а выход не
+# отзывает уже выданную cookie до SESSION_COOKIE_AGE.
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_MODE = os.environ.get('SESSION_MODE', 'db')
+if SESSION_MODE not in SESSION_ENGINES:
+    raise ImproperlyConfigured(
+        f'Неизвестный SESSION_MODE {SESSION_MODE!r}, '
+        f'допустимы: {", ".join(SESSION_ENGINES)}.'
+    )
+SESSION_ENGINE = SESSION_ENGINES[SESSION_MODE]
+
 
 AUTH_PASSWORD_VALIDATORS = []
 
@@ -80,3 +113,27 @@ LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+
+COMMENTS_COUNT_ON_PAGE = 50
+
+# Файл с дополнительными запрещёнными словами, по одному в строке.
+BAD_WORDS_FILE = None
+
+# Время жизни закэшированной страницы новости для анонимов, в секундах.
+# Кэш сбрасывается при изменении новости или её комментариев.
+NEWS_FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Кэш главной страницы целиком для анонимов, выключен по умолчанию.
+NEWS_HOME_CACHE_ENABLED = False
+NEWS_HOME_CACHE_TIMEOUT = 60
+
+# Замеры времени страниц: заголовок Server-Timing и процентили
+# последних PROFILING_WINDOW запросов на news:profiling.
+PROFILING_ENABLED = False
+PROFILING_WINDOW = 1000
+
+# Результатов поиска на странице, см. news.search.
+NEWS_SEARCH_COUNT_ON_PAGE = 10
+
+# Окна рейтинга самых обсуждаемых новостей, в часах.
+NEWS_RANKING_WINDOWS = {'day': 24, 'week': 7 * 24}
@@ -0,0 +1,99 @@
+from itertools import accumulate, islice
+from random import Random
+from secrets import token_hex
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from .models import Note
+
+User = get_user_model()
+
+TITLE_WORDS = (
+    'список', 'покупок', 'планы', 'на', 'неделю', 'идеи', 'для', 'отпуска',
+    'книги', 'фильмы', 'рецепт', 'борща', 'задачи', 'проекта', 'встреча',
+    'с', 'командой', 'заметки', 'лекции', 'по', 'истории', 'математике',
+    'подарки', 'друзьям', 'ремонт', 'квартиры', 'тренировки', 'утром',
+    'цитаты', 'мысли', 'вслух', 'дача', 'огород', 'поездка', 'в', 'Питер',
+)
+TITLES_COUNT = 2000
+TEXT_SENTENCES = (
+    'Не забыть купить хлеб и молоко.',
+    'Позвонить маме в воскресенье.',
+    'Обсудить сроки с заказчиком.',
+    'Прочитать ещё две главы до пятницы.',
+    'Записаться к врачу на следующей неделе.',
+    'Проверить почту и ответить на письма.',
+)
+
+
+def zipf_weights(count, exponent=1.0):
+    """Накопленные веса распределения Ципфа для random.choices."""
+    return list(accumulate(
+        1 / rank ** exponent for rank in range(1, count + 1)
+    ))
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    batch = list(islice(iterator, size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, size))
+
+
+def create_users(count, batch_size=5000):
+    """Создаёт пользователей с неиспользуемым паролем, возвращает их id."""
+    run = token_hex(4)
+    password = make_password(None)
+    for batch in batched(range(count), batch_size):
+        User.objects.bulk_create(
+            User(username=f'user-{run}-{index}', password=password)
+            for index in batch
+        )
+    return list(User.objects.filter(
+        username__startswith=f'user-{run}-'
+    ).values_list('id', flat=True))
+
+
+def generate_notes_data(users, notes, authors=(), seed=0, batch_size=5000):
+    """
+    Создаёт пользователей и заметки через bulk_create.
+
+    Число заметок у пользователя распределено по Ципфу: первые
+    авторы из authors, затем новые пользователи, ведут больше всего
+    заметок. Заголовки на кириллице собираются из TITLE_WORDS в набор
+    из TITLES_COUNT вариантов, частота которых тоже распределена
+    по Ципфу, slug подбирается по правилам Note.save.
+    Возвращает id авторов в порядке убывания числа заметок.
+    """
+    random = Random(seed)
+    author_ids = [author.pk for author in authors] + create_users(users)
+    weights = zipf_weights(len(author_ids))
+    titles = [
+        ' '.join(
+            random.sample(TITLE_WORDS, random.randint(2, 4))
+        ).capitalize()
+        for _ in range(TITLES_COUNT)
+    ]
+    title_weights = zipf_weights(TITLES_COUNT)
+    last_numbers = {}
+    for batch in batched(range(notes), batch_size):
+        note_list = [
+            Note(
+                title=title,
+                text=' '.join(random.choices(TEXT_SENTENCES, k=3)),
+                author_id=author_id,
+            )
+            for title, author_id in zip(
+                random.choices(titles, cum_weights=title_weights,
+                               k=len(batch)),
+                random.choices(author_ids, cum_weights=weights,
+                               k=len(batch))
+            )
+        ]
+        with transaction.atomic():
+            Note.fill_free_slugs(note_list, last_numbers)
+            Note.bulk_create_indexed(note_list)
+    return author_ids
@@ -0,0 +1,83 @@
+import csv
+import json
+import sys
+from contextlib import contextmanager
+
+from django.core.management.base import CommandError
+
+FIELDS = ('title', 'text', 'slug', 'author')
+REQUIRED_FIELDS = ('title', 'author')
+FORMATS = ('jsonl', 'csv')
+STDIO = '-'
+
+# Текст заметки может не поместиться в ограничение csv по умолчанию.
+csv.field_size_limit(2 ** 31 - 1)
+
+
+def detect_format(path, file_format=None):
+    if file_format:
+        return file_format
+    return 'csv' if str(path).lower().endswith('.csv') else 'jsonl'
+
+
+@contextmanager
+def open_stream(path, mode):
+    """Файл или stdin/stdout для пути «-»."""
+    if path == STDIO:
+        yield sys.stdin if 'r' in mode else sys.stdout
+        return
+    with open(path, mode, encoding='utf-8', newline='') as stream:
+        yield stream
+
+
+def parse_rows(stream, file_format):
+    """Номера строк файла и разобранные из них значения."""
+    if file_format == 'csv':
+        reader = csv.DictReader(stream)
+        try:
+            for row in reader:
+                yield reader.line_num, row
+        except csv.Error as error:
+            raise CommandError(f'Строка {reader.line_num}: {error}')
+        return
+    for number, line in enumerate(stream, start=1):
+        if line.strip():
+            try:
+                yield number, json.loads(line)
+            except json.JSONDecodeError as error:
+                raise CommandError(f'Строка {number}: {error}')
+
+
+def read_rows(stream, file_format):
+    """
+    Построчно читает словари с полями заметки и номера их строк.
+
+    Строка, которая не разбирается или без обязательных полей,
+    останавливает чтение с CommandError и номером строки.
+    """
+    for number, row in parse_rows(stream, file_format):
+        if not isinstance(row, dict) or not all(
+            isinstance(row.get(field), str) and row[field]
+            for field in REQUIRED_FIELDS
+        ):
+            raise CommandError(
+                f'Строка {number}: нужны поля {", ".join(REQUIRED_FIELDS)}.'
+            )
+        yield number, row
+
+
+class RowWriter:
+    """Построчно пишет словари с полями заметки."""
+
+    def __init__(self, stream, file_format):
+        self.stream = stream
+        self.file_format = file_format
+        if file_format == 'csv':
+            self.csv_writer = csv.DictWriter(stream, fieldnames=FIELDS)
+            self.csv_writer.writeheader()
+
+    def write(self, row):
+        if self.file_format == 'csv':
+            self.csv_writer.writerow(row)
+        else:
+            self.stream.write(json.dumps(row, ensure_ascii=False) + '\n')
@@ -0,0 +1,35 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from notes.models import Note
+from ._notes_io import (FIELDS, FORMATS, STDIO, RowWriter, detect_format,
+                        open_stream)
+
+
+class Command(BaseCommand):
+    help = 'Выгружает заметки в JSON Lines или CSV, не держа их в памяти.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл для заметок, «-» - stdout.')
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = 0
+        start = perf_counter()
+        file_format = detect_format(options['path'], options['format'])
+        notes = Note.objects.order_by('id').values_list(
+            'title', 'text', 'slug', 'author__username'
+        ).iterator(chunk_size=options['batch_size'])
+        with open_stream(options['path'], 'w') as stream:
+            writer = RowWriter(stream, file_format)
+            for note in notes:
+                writer.write(dict(zip(FIELDS, note)))
+                total += 1
+        elapsed = perf_counter() - start
+        report = self.stderr if options['path'] == STDIO else self.stdout
+        report.write(self.style.SUCCESS(
+            f'Выгружено {total} заметок за {elapsed:.2f} с '
+            f'({total / elapsed if elapsed else 0:.0f} заметок/с)'
+        ))
@@ -0,0 +1,31 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from notes.fake_data import generate_notes_data
+
+
+class Command(BaseCommand):
+    help = 'Создаёт синтетических пользователей и заметки для нагрузки.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--notes', type=int, default=100000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        start = perf_counter()
+        generate_notes_data(
+            users=options['users'],
+            notes=options['notes'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+        )
+        elapsed = perf_counter() - start
+        rows = options['users'] + options['notes']
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано {options["users"]} пользователей и '
+            f'{options["notes"]} заметок за {elapsed:.2f} с '
+            f'({rows / elapsed if elapsed else 0:.0f} строк/с)'
+        ))
@@ -0,0 +1,100 @@
+from itertools import islice
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+
+from notes.models import Note
+from ._notes_io import FORMATS, detect_format, open_stream, read_rows
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает заметки из JSON Lines или CSV '
+        '(поля title, text, slug, author) пачками через bulk_create.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл с заметками, «-» - stdin.')
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        self.authors = {}
+        self.last_numbers = {}
+        total = 0
+        start = perf_counter()
+        file_format = detect_format(options['path'], options['format'])
+        with open_stream(options['path'], 'r') as stream:
+            rows = read_rows(stream, file_format)
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                self.import_batch(batch)
+                total += len(batch)
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'Загружено заметок: {total}')
+        elapsed = perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено {total} заметок за {elapsed:.2f} с '
+            f'({total / elapsed if elapsed else 0:.0f} заметок/с)'
+        ))
+
+    def get_authors(self, usernames):
+        """Авторы по username, неизвестные догружаются одним запросом."""
+        usernames = set(usernames)
+        missing = usernames - self.authors.keys()
+        if missing:
+            self.authors.update(
+                User.objects.filter(username__in=missing).values_list(
+                    'username', 'id'
+                )
+            )
+        unknown = usernames - self.authors.keys()
+        if unknown:
+            raise CommandError(
+                f'Неизвестные авторы: {", ".join(sorted(unknown))}'
+            )
+        return self.authors
+
+    def import_batch(self, batch):
+        """Пачка пар (номер строки, поля заметки) одной транзакцией."""
+        numbers = [number for number, _ in batch]
+        authors = self.get_authors(row['author'] for _, row in batch)
+        notes = [
+            Note(
+                title=row['title'],
+                text=row.get('text') or '',
+                slug=row.get('slug') or '',
+                author_id=authors[row['author']],
+            )
+            for _, row in batch
+        ]
+        try:
+            with transaction.atomic():
+                self.check_slugs(notes, numbers)
+                Note.fill_free_slugs(notes, self.last_numbers)
+                Note.bulk_create_indexed(notes)
+        except IntegrityError as error:
+            raise CommandError(
+                f'Строки {numbers[0]}-{numbers[-1]}: {error}'
+            )
+
+    def check_slugs(self, notes, numbers):
+        """Заданные в файле slug не должны быть заняты."""
+        taken = set(Note.objects.filter(
+            slug__in={note.slug for note in notes if note.slug}
+        ).values_list('slug', flat=True))
+        for number, note in zip(numbers, notes):
+            if not note.slug:
+                continue
+            if note.slug in taken:
+                raise CommandError(
+                    f'Строка {number}: slug {note.slug} уже занят.'
+                )
+            taken.add(note.slug)
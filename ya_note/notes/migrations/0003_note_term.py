@@ -0,0 +1,77 @@
+# Generated by Django 3.2.15 on 2026-10-18 17:34
+
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+BATCH_SIZE = 1000
+TERM = re.compile(r'\w+')
+TERM_MAX_LENGTH = 50
+TITLE_TERM_WEIGHT = 3
+
+
+def get_terms(text):
+    """Копия notes.utils.get_terms на момент миграции."""
+    return [
+        term[:TERM_MAX_LENGTH]
+        for term in TERM.findall(text.lower().replace('ё', 'е'))
+        if len(term) > 1
+    ]
+
+
+def get_term_weights(text, title=''):
+    """Копия notes.utils.get_term_weights на момент миграции."""
+    weights = Counter(get_terms(text))
+    for term in get_terms(title):
+        weights[term] += TITLE_TERM_WEIGHT
+    return weights
+
+
+def fill_note_terms(apps, schema_editor):
+    Note = apps.get_model('notes', 'Note')
+    NoteTerm = apps.get_model('notes', 'NoteTerm')
+    batch = []
+    notes = Note.objects.only('author_id', 'title', 'text')
+    for note in notes.iterator(BATCH_SIZE):
+        batch.extend(
+            NoteTerm(
+                note_id=note.pk,
+                author_id=note.author_id,
+                term=term,
+                weight=weight
+            )
+            for term, weight in get_term_weights(note.text, note.title).items()
+        )
+        if len(batch) >= BATCH_SIZE:
+            NoteTerm.objects.bulk_create(batch)
+            batch = []
+    NoteTerm.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('notes', '0002_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoteTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=50)),
+                ('weight', models.PositiveIntegerField()),
+                ('author', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('note', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terms', to='notes.note')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='noteterm',
+            index=models.Index(fields=['author', 'term', 'note', 'weight'], name='note_term_idx'),
+        ),
+        migrations.RunPython(fill_note_terms, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,15 @@
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import Count, Q, Sum
 
-from pytils.translit import slugify
+from .utils import TERM_MAX_LENGTH, get_term_weights, get_terms, slugify
+
+SLUG_SEPARATOR = '-'
+# Следующий за разделителем символ: верхняя граница диапазона «stem-*».
+SLUG_PREFIX_END = chr(ord(SLUG_SEPARATOR) + 1)
+# Место под суффикс вида «-123456789» в конце slug.
+SLUG_SUFFIX_LENGTH = 10
+SLUG_SAVE_ATTEMPTS = 5
 
 
 class Note(models.Model):
@@ -28,11 +36,200 @@ class Note(models.Model):
         on_delete=models.CASCADE,
     )
 
+    class Meta:
+        indexes = (
+            models.Index(fields=('author', 'id'), name='note_author_id_idx'),
+        )
+
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        """Заметка и её поисковый индекс сохраняются в одной транзакции."""
+        with transaction.atomic():
+            self.save_with_free_slug(*args, **kwargs)
+            self.index_terms((self,))
+
+    def save_with_free_slug(self, *args, **kwargs):
+        """
+        Пустой slug заполняется свободным значением по заголовку.
+
+        Если между выбором slug и вставкой его занял параллельный
+        запрос, выбор повторяется.
+        """
+        if self.slug:
+            return super().save(*args, **kwargs)
+        for attempt in range(SLUG_SAVE_ATTEMPTS):
+            self.slug = self.get_free_slug()
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                self.slug = ''
+                if attempt == SLUG_SAVE_ATTEMPTS - 1:
+                    raise
+
+    def get_free_slug(self):
+        """Первый свободный slug из ряда «title», «title-2», «title-3»..."""
+        slug = self.slug_from_title(self.title)
+        numbers = self.get_taken_slug_numbers(slug, exclude_pk=self.pk)
+        if 1 not in numbers:
+            return slug
+        return self.numbered_slug(slug, max(numbers) + 1)
+
+    @classmethod
+    def fill_free_slugs(cls, notes, last_numbers=None):
+        """
+        Заполняет пустые slug пачки заметок по правилам Note.save.
+
+        Занятость всех slug пачки проверяется одним запросом; ряд
+        «title-N» запрашивается только для совпавших заголовков.
+        Заданные slug считаются занятыми и не проверяются.
+        Словарь last_numbers с последними номерами рядов можно
+        передавать между пачками одной загрузки, чтобы не запрашивать
+        ряды повторно.
+        """
+        if last_numbers is None:
+            last_numbers = {}
+        bases = [
+            (note, cls.slug_from_title(note.title))
+            for note in notes if not note.slug
+        ]
+        used = {note.slug for note in notes if note.slug}
+        taken = set(cls.objects.filter(
+            slug__in={base for _, base in bases if base not in last_numbers}
+        ).values_list('slug', flat=True))
+        for note, base in bases:
+            if (base not in last_numbers
+                    and base not in taken and base not in used):
+                note.slug = base
+            else:
+                if base not in last_numbers:
+                    last_numbers[base] = max(
+                        cls.get_taken_slug_numbers(base) | {1}
+                    )
+                while not note.slug or note.slug in used:
+                    last_numbers[base] += 1
+                    note.slug = cls.numbered_slug(base, last_numbers[base])
+            used.add(note.slug)
+
+    @classmethod
+    def index_terms(cls, notes):
+        """
+        Пересобирает поисковый индекс сохранённых заметок.
+
+        Старые слова удаляются одним запросом, при удалении заметки
+        их удаляет каскад. Новые вставляются одним executemany: слов
+        в десятки раз больше, чем заметок, и создание экземпляров
+        NoteTerm для bulk_create заняло бы большую часть времени.
+        """
+        NoteTerm.objects.filter(note__in=[note.pk for note in notes]).delete()
+        rows = [
+            (note.pk, note.author_id, term, weight)
+            for note in notes
+            for term, weight in get_term_weights(note.text, note.title).items()
+        ]
+        if not rows:
+            return
+        quote_name = connection.ops.quote_name
+        columns = ', '.join(
+            quote_name(NoteTerm._meta.get_field(name).column)
+            for name in ('note', 'author', 'term', 'weight')
+        )
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {quote_name(NoteTerm._meta.db_table)} '
+                f'({columns}) VALUES (%s, %s, %s, %s)',
+                rows
+            )
+
+    @classmethod
+    def bulk_create_indexed(cls, notes):
+        """
+        Вставляет пачку заметок с заполненными slug и индексирует их.
+
+        SQLite не возвращает id из bulk_create, поэтому заметки
+        для индекса перечитываются по slug.
+        """
+        cls.objects.bulk_create(notes)
+        cls.index_terms(cls.objects.filter(
+            slug__in=[note.slug for note in notes]
+        ).only('author_id', 'title', 'text'))
+
+    @classmethod
+    def search(cls, author, query):
+        """
+        Id и вес заметок автора со всеми словами запроса.
+
+        Сортировка по убыванию веса, затем от новых к старым. Запрос
+        читает только индекс (author, term, note, weight) и не
+        обращается к самим заметкам.
+        """
+        terms = set(get_terms(query))
+        return NoteTerm.objects.filter(
+            author=author, term__in=terms
+        ).values_list('note').annotate(
+            score=Sum('weight'), matched=Count('term')
+        ).filter(matched=len(terms)).order_by('-score', '-note')
+
+    @classmethod
+    def slug_from_title(cls, title):
+        return slugify(title)[:cls._meta.get_field('slug').max_length]
+
+    @classmethod
+    def numbered_slug(cls, slug, number):
+        """Slug с номером number в ряду заметок с одним заголовком."""
+        if number == 1:
+            return slug
+        max_length = cls._meta.get_field('slug').max_length
+        stem = slug[:max_length - SLUG_SUFFIX_LENGTH]
+        return f'{stem}{SLUG_SEPARATOR}{number}'
+
+    @classmethod
+    def get_taken_slug_numbers(cls, slug, exclude_pk=None):
+        """
+        Номера занятых slug из ряда, начинающегося с slug.
+
+        Выбираются одним запросом по диапазону уникального индекса slug.
+        """
+        max_length = cls._meta.get_field('slug').max_length
+        stem = slug[:max_length - SLUG_SUFFIX_LENGTH]
+        prefix = stem + SLUG_SEPARATOR
+        taken = set(cls.objects.filter(
+            Q(slug=slug) | Q(slug__gte=prefix, slug__lt=stem + SLUG_PREFIX_END)
+        ).exclude(pk=exclude_pk).values_list('slug', flat=True))
+        numbers = {
+            int(value[len(prefix):]) for value in taken
+            if value.startswith(prefix) and value[len(prefix):].isdigit()
+        }
+        if slug in taken:
+            numbers.add(1)
+        return numbers
+
+
+class NoteTerm(models.Model):
+    """Слово заметки в поисковом индексе, см. Note.index_terms."""
+    note = models.ForeignKey(
+        Note,
+        on_delete=models.CASCADE,
+        related_name='terms'
+    )
+    # Автора покрывает составной индекс note_term_idx.
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        db_index=False
+    )
+    term = models.CharField(max_length=TERM_MAX_LENGTH)
+    weight = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('author', 'term', 'note', 'weight'),
+                name='note_term_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.term}: {self.weight}'
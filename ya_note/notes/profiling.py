@@ -0,0 +1,129 @@
+"""Замеры времени страниц YaNote, см. ProfilingMiddleware."""
+from collections import defaultdict, deque
+from statistics import quantiles
+from threading import Lock
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.auth.mixins import UserPassesTestMixin
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import JsonResponse
+from django.views import generic
+
+PERCENTILES = (50, 90, 99)
+METRICS = ('total', 'sql', 'template', 'queries')
+
+
+class SqlTimer:
+    """Считает запросы и их суммарное время, см. execute_wrapper."""
+
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.time += perf_counter() - start
+
+
+class ProfileStats:
+    """Последние замеры по имени маршрута и их процентили."""
+
+    def __init__(self, window):
+        self.lock = Lock()
+        self.samples = defaultdict(lambda: deque(maxlen=window))
+
+    def record(self, url_name, **sample):
+        with self.lock:
+            self.samples[url_name].append(sample)
+
+    def clear(self):
+        with self.lock:
+            self.samples.clear()
+
+    def summary(self):
+        with self.lock:
+            samples = {name: list(values)
+                       for name, values in self.samples.items()}
+        return {
+            name: {
+                'count': len(values),
+                **{
+                    metric: percentiles([value[metric] for value in values])
+                    for metric in METRICS
+                },
+            }
+            for name, values in samples.items()
+        }
+
+
+def percentiles(values):
+    if len(values) == 1:
+        values = values * 2
+    cuts = quantiles(values, n=100, method='inclusive')
+    return {f'p{percent}': round(cuts[percent - 1], 3)
+            for percent in PERCENTILES}
+
+
+stats = ProfileStats(settings.PROFILING_WINDOW)
+
+
+class ProfilingMiddleware:
+    """
+    Замеры SQL, отрисовки шаблона и всего запроса для каждой страницы.
+
+    Включается настройкой PROFILING_ENABLED, должен стоять первым
+    в MIDDLEWARE. Добавляет заголовок Server-Timing и копит замеры
+    в stats; времена в миллисекундах.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = SqlTimer()
+        request.template_time = 0.0
+        start = perf_counter()
+        with connection.execute_wrapper(timer):
+            response = self.get_response(request)
+        total = perf_counter() - start
+        response['Server-Timing'] = ', '.join((
+            f'sql;dur={timer.time * 1000:.3f};desc="{timer.count} queries"',
+            f'template;dur={request.template_time * 1000:.3f}',
+            f'total;dur={total * 1000:.3f}',
+        ))
+        if request.resolver_match:
+            stats.record(
+                request.resolver_match.view_name,
+                total=total * 1000,
+                sql=timer.time * 1000,
+                template=request.template_time * 1000,
+                queries=timer.count,
+            )
+        return response
+
+    def process_template_response(self, request, response):
+        start = perf_counter()
+
+        def rendered(response):
+            request.template_time = perf_counter() - start
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
+class ProfilingStats(UserPassesTestMixin, generic.View):
+    """Процентили замеров по страницам, только для персонала."""
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(stats.summary())
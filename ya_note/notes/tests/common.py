@@ -1,10 +1,45 @@
+import re
+from contextlib import contextmanager
+from importlib import import_module
+
+from django.conf import settings
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.urls import reverse
-from django.contrib.auth import get_user_model
+from django.contrib.auth import (BACKEND_SESSION_KEY, HASH_SESSION_KEY,
+                                 SESSION_KEY, get_user_model)
 from notes.models import Note
 
 User = get_user_model()
 
+# Полный просмотр таблицы или сортировка во временном дереве.
+SLOW_PLAN = re.compile(r'^SCAN (TABLE )?\w+$|USE TEMP B-TREE FOR ORDER BY')
+
+
+def login_client(user):
+    """
+    Клиент с сессией пользователя, как после force_login.
+
+    Сессия записывается напрямую, без запроса через обработчик,
+    сигналов входа и обновления last_login.
+    """
+    session = import_module(settings.SESSION_ENGINE).SessionStore()
+    session[SESSION_KEY] = user._meta.pk.value_to_string(user)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.save()
+    client = Client()
+    client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+    return client
+
+
+def report(title, **results):
+    """Печатает результаты замеров, запуск с pytest -s."""
+    print(f'\n{title}')
+    for name, value in results.items():
+        print(f'  {name}: {value}')
+
 
 class CommonTestSetup(TestCase):
 
@@ -18,12 +53,31 @@ class CommonTestSetup(TestCase):
             author=cls.author
         )
         cls.reader = User.objects.create(username='Читатель простой')
-        cls.author_client = Client()
-        cls.reader_client = Client()
-        cls.author_client.force_login(cls.author)
-        cls.reader_client.force_login(cls.reader)
+        cls.author_client = login_client(cls.author)
+        cls.reader_client = login_client(cls.reader)
         cls.add_url = reverse('notes:add')
         cls.edit_url = reverse('notes:edit', args=(cls.note.slug,))
         cls.delete_url = reverse('notes:delete', args=(cls.note.slug,))
         cls.list_url = reverse('notes:list')
         cls.success_url = reverse('notes:success')
+
+    @contextmanager
+    def assert_uses_indexes(self):
+        """
+        Проверяет планы SELECT-запросов, выполненных внутри блока.
+
+        Каждый запрос должен читать таблицы по индексу и не сортировать
+        результат во временном дереве.
+        """
+        with CaptureQueriesContext(connection) as context:
+            yield
+        for query in context.captured_queries:
+            if not query['sql'].startswith('SELECT'):
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+                plan = [row[-1] for row in cursor.fetchall()]
+            self.assertFalse(
+                any(map(SLOW_PLAN.search, plan)),
+                f'{query["sql"]}\n' + '\n'.join(plan)
+            )
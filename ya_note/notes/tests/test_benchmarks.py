@@ -0,0 +1,221 @@
+from time import perf_counter
+from timeit import repeat, timeit
+
+import pytest
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from pytils.translit import slugify
+
+from notes.fake_data import generate_notes_data
+from notes.models import Note
+from notes.utils import slugify as cached_slugify
+from notes.utils import slugify_cache_stats
+from .common import report
+
+User = get_user_model()
+
+
+class QueryCounter:
+    """Считает запросы без ограничения на размер журнала."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@pytest.mark.benchmark
+class TestSlugBenchmark(TestCase):
+    """Запуск: pytest -m benchmark -s"""
+    USERS_COUNT = 20
+    NOTES_PER_USER = 25
+    TITLE = 'Список покупок'
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create(
+            User(username=f'Пользователь {index}')
+            for index in range(cls.USERS_COUNT)
+        )
+        cls.users = list(User.objects.all())
+
+    def create_notes(self, save):
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            start = perf_counter()
+            for _ in range(self.NOTES_PER_USER):
+                for user in self.users:
+                    save(Note(title=self.TITLE, author=user))
+            elapsed = perf_counter() - start
+        count = self.USERS_COUNT * self.NOTES_PER_USER
+        return (
+            f'{elapsed / count * 1000:.3f} мс/заметку, '
+            f'{counter.count / count:.1f} запросов/заметку'
+        )
+
+    @staticmethod
+    def save_with_loop(note):
+        """Подбор суффикса перебором с запросом на каждую попытку."""
+        base = slugify(note.title)
+        note.slug, number = base, 1
+        while Note.objects.filter(slug=note.slug).exists():
+            number += 1
+            note.slug = f'{base}-{number}'
+        note.save()
+
+    def test_same_title_notes(self):
+        loop = self.create_notes(self.save_with_loop)
+        Note.objects.all().delete()
+        prefix_query = self.create_notes(Note.save)
+        report(
+            f'{self.USERS_COUNT * self.NOTES_PER_USER} заметок '
+            f'«{self.TITLE}»',
+            loop=loop,
+            prefix_query=prefix_query,
+        )
+
+
+@pytest.mark.benchmark
+class TestSlugifyBenchmark(TestCase):
+    """Запуск: pytest -m benchmark -s"""
+    NOTES_COUNT = 100000
+    TITLES = tuple(f'Заметка про дела на день {day}' for day in range(365))
+
+    def test_slugify_per_note(self):
+        titles = [
+            self.TITLES[index % len(self.TITLES)]
+            for index in range(self.NOTES_COUNT)
+        ]
+        cached_slugify.cache_clear()
+        results = {}
+        for name, func in (
+            ('pytils', slugify),
+            ('lru_cache', cached_slugify),
+        ):
+            elapsed = timeit(lambda: [func(title) for title in titles],
+                             number=1)
+            results[name] = f'{elapsed / self.NOTES_COUNT * 1e6:.2f} мкс'
+        stats = slugify_cache_stats()
+        results['hit_rate'] = f'{stats["hit_rate"]:.1%}'
+        report(
+            f'Транслитерация {self.NOTES_COUNT} заголовков '
+            f'({len(self.TITLES)} различных)',
+            **results
+        )
+
+
+@pytest.mark.benchmark
+class TestSearchBenchmark(TestCase):
+    """Запуск: pytest -m benchmark -s"""
+    NOTEBOOK_SIZES = (1000, 10000, 100000)
+    RARE_NOTES_COUNT = 20
+    QUERIES = {
+        'редкое слово': 'маяк',
+        'частые слова': 'список покупок',
+    }
+    REPEAT = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        for _ in range(cls.RARE_NOTES_COUNT):
+            Note.objects.create(
+                title='Поездка', text='Ночью светит маяк', author=cls.author
+            )
+
+    def test_search_latency(self):
+        """Время страницы поиска по мере роста числа заметок автора"""
+        self.client.force_login(self.author)
+        url = reverse('notes:search')
+        results = {}
+        notes_count = self.RARE_NOTES_COUNT
+        for size in self.NOTEBOOK_SIZES:
+            generate_notes_data(
+                users=0, notes=size - notes_count, authors=(self.author,),
+                seed=size
+            )
+            notes_count = size
+            for name, query in self.QUERIES.items():
+                response = self.client.get(url, {'q': query})
+                self.assertTrue(response.context['object_list'])
+                elapsed = min(repeat(
+                    lambda: self.client.get(url, {'q': query}),
+                    number=1, repeat=self.REPEAT
+                ))
+                results[f'{size} заметок, {name}'] = (
+                    f'{elapsed * 1000:.2f} мс'
+                )
+        report('Поиск по заметкам одного автора', **results)
+
+
+@pytest.mark.benchmark
+class TestSessionBenchmark(TestCase):
+    """Запуск: pytest -m benchmark -s"""
+    PASSWORD = 'password'
+    REQUESTS = 200
+    REPEAT = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('Автор', password=cls.PASSWORD)
+        cls.note = Note.objects.create(
+            title='Поездка', text='Ночью светит маяк', author=cls.author
+        )
+        cls.urls = {
+            'list': reverse('notes:list'),
+            'detail': reverse('notes:detail', args=(cls.note.slug,)),
+            'add': reverse('notes:add'),
+            'edit': reverse('notes:edit', args=(cls.note.slug,)),
+            'search': f'{reverse("notes:search")}?q=маяк',
+        }
+
+    def session_queries(self, client, url, data=None):
+        """Запросов к таблице сессий и всего запросов на один запрос."""
+        with CaptureQueriesContext(connection) as context:
+            if data is None:
+                client.get(url)
+            else:
+                client.post(url, data)
+        return sum(
+            'django_session' in query['sql']
+            for query in context.captured_queries
+        ), len(context)
+
+    def test_session_engines(self):
+        """Запросы и время страниц вошедшего с разными хранилищами сессий"""
+        results = {'login': []}
+        for mode, engine in settings.SESSION_ENGINES.items():
+            with override_settings(SESSION_ENGINE=engine):
+                client = Client()
+                found, total = self.session_queries(
+                    client, reverse('users:login'),
+                    {'username': self.author.username,
+                     'password': self.PASSWORD}
+                )
+                results['login'].append(f'{mode} {found}/{total}')
+                for name, url in self.urls.items():
+                    client.get(url)
+                    found, total = self.session_queries(client, url)
+                    results.setdefault(name, []).append(
+                        f'{mode} {found}/{total}'
+                    )
+
+                def send():
+                    for _ in range(self.REQUESTS // len(self.urls)):
+                        for url in self.urls.values():
+                            client.get(url)
+
+                elapsed = min(repeat(send, number=1, repeat=self.REPEAT))
+                results.setdefault('time', []).append(
+                    f'{mode} {elapsed * 1000 / self.REQUESTS:.2f} мс'
+                )
+        report(
+            'Запросы к сессиям / всего запросов и время страницы вошедшего',
+            **{name: ', '.join(row) for name, row in results.items()}
+        )
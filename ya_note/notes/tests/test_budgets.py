@@ -0,0 +1,97 @@
+from statistics import median
+from time import perf_counter
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+
+from notes.fake_data import generate_notes_data
+from notes.profiling import SqlTimer
+from notes.urls import app_name, urlpatterns
+from .common import CommonTestSetup, report
+
+
+class BudgetsSetup(CommonTestSetup):
+    """Замеры всех страниц notes.urls на большом наборе данных."""
+    USERS_COUNT = 100
+    NOTES_COUNT = 20000
+    REPEAT = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        generate_notes_data(
+            users=cls.USERS_COUNT,
+            notes=cls.NOTES_COUNT,
+            authors=(cls.author, cls.reader)
+        )
+        cls.url_args = {
+            'home': ((), {}),
+            'add': ((), {}),
+            'edit': ((cls.note.slug,), {}),
+            'detail': ((cls.note.slug,), {}),
+            'delete': ((cls.note.slug,), {}),
+            'list': ((), {}),
+            'search': ((), {'q': 'Список покупок'}),
+            'success': ((), {}),
+            'profiling': ((), {}),
+        }
+
+    def measure(self, url, params):
+        """Запросы, время SQL и медиана времени ответа, в мс."""
+        latencies = []
+        for _ in range(self.REPEAT):
+            timer = SqlTimer()
+            with connection.execute_wrapper(timer):
+                start = perf_counter()
+                self.author_client.get(url, params)
+                latencies.append((perf_counter() - start) * 1000)
+        return timer.count, timer.time * 1000, median(latencies)
+
+    def check_pages(self, check):
+        """
+        Замеряет каждую страницу notes.urls и проверяет её в своём подтесте.
+
+        check(pattern, queries, sql_ms, latency_ms) вызывается внутри
+        подтеста, поэтому превышение бюджета одной страницы не прерывает
+        проверку остальных.
+        """
+        for pattern in urlpatterns:
+            with self.subTest(url=pattern.name):
+                self.assertTrue(hasattr(pattern, 'budget'),
+                                'Не задан бюджет страницы')
+                self.assertIn(pattern.name, self.url_args,
+                              'Не заданы параметры страницы')
+                args, params = self.url_args[pattern.name]
+                url = reverse(f'{app_name}:{pattern.name}', args=args)
+                check(pattern, *self.measure(url, params))
+
+
+class TestBudgets(BudgetsSetup):
+
+    def test_url_query_budgets(self):
+        """Проверяет, что страницы укладываются в бюджет запросов"""
+        def check(pattern, queries, sql_ms, latency_ms):
+            self.assertLessEqual(queries, pattern.budget.queries)
+
+        self.check_pages(check)
+
+
+@pytest.mark.benchmark
+class TestLatencyBudgets(BudgetsSetup):
+    """Запуск: pytest -m benchmark -s"""
+
+    def test_url_latency_budgets(self):
+        """Проверяет, что страницы укладываются в бюджет времени"""
+        results = {}
+
+        def check(pattern, queries, sql_ms, latency_ms):
+            results[pattern.name] = (
+                f'{queries} запросов ({pattern.budget.queries}), '
+                f'SQL {sql_ms:.1f} мс, ответ {latency_ms:.1f} мс '
+                f'({pattern.budget.ms})'
+            )
+            self.assertLessEqual(latency_ms, pattern.budget.ms)
+
+        self.check_pages(check)
+        report('Бюджеты страниц YaNote', **results)
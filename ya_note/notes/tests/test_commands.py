@@ -0,0 +1,129 @@
+import json
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Count
+
+from notes.models import Note
+from .common import CommonTestSetup
+
+User = get_user_model()
+
+
+class TestNotesCommands(CommonTestSetup):
+
+    def setUp(self):
+        super().setUp()
+        temp_dir = TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.path = Path(temp_dir.name)
+
+    def write_jsonl(self, rows):
+        path = self.path / 'notes.jsonl'
+        path.write_text(
+            ''.join(json.dumps(row, ensure_ascii=False) + '\n'
+                    for row in rows),
+            encoding='utf-8'
+        )
+        return path
+
+    def test_import_jsonl(self):
+        """Тест загрузки заметок с подбором slug как в Note.save"""
+        path = self.write_jsonl([
+            {'title': self.note.title, 'text': 'Раз',
+             'author': self.author.username},
+            {'title': self.note.title, 'text': 'Два',
+             'author': self.reader.username},
+            {'title': 'Своя', 'text': 'Три', 'slug': 'own',
+             'author': self.reader.username},
+        ])
+        call_command('import_notes', path, batch_size=2, stdout=StringIO())
+        self.assertEqual(
+            list(Note.objects.order_by('id').values_list('slug', 'text')),
+            [
+                (self.note.slug, self.note.text),
+                (f'{self.note.slug}-2', 'Раз'),
+                (f'{self.note.slug}-3', 'Два'),
+                ('own', 'Три'),
+            ]
+        )
+        self.assertEqual(
+            [note_id for note_id, _, _ in Note.search(self.reader, 'три')],
+            [Note.objects.get(slug='own').id]
+        )
+
+    def test_import_errors(self):
+        """Тест отказа загрузки с неизвестным автором или занятым slug"""
+        rows = (
+            {'title': 'Заметка', 'text': 'Текст', 'author': 'Неизвестный'},
+            {'title': 'Заметка', 'text': 'Текст', 'slug': self.note.slug,
+             'author': self.author.username},
+        )
+        notes_count = Note.objects.count()
+        for row in rows:
+            with self.subTest(row=row):
+                path = self.write_jsonl([row])
+                with self.assertRaises(CommandError):
+                    call_command('import_notes', path, stdout=StringIO())
+                self.assertEqual(Note.objects.count(), notes_count)
+
+    def test_import_bad_rows(self):
+        """Тест отказа загрузки с номером неразборчивой строки"""
+        good = json.dumps(
+            {'title': 'Заметка', 'author': self.author.username},
+            ensure_ascii=False
+        )
+        bad_rows = (
+            '{"title": "Без закрывающей скобки"',
+            '["title", "author"]',
+            json.dumps({'title': 'Без автора'}, ensure_ascii=False),
+            json.dumps({'title': None, 'author': self.author.username}),
+        )
+        path = self.path / 'notes.jsonl'
+        notes_count = Note.objects.count()
+        for bad_row in bad_rows:
+            with self.subTest(row=bad_row):
+                path.write_text(
+                    f'{good}\n\n{bad_row}\n{good}\n', encoding='utf-8'
+                )
+                with self.assertRaisesRegex(CommandError, r'^Строка 3: '):
+                    call_command('import_notes', path, stdout=StringIO())
+                self.assertEqual(Note.objects.count(), notes_count)
+
+    def test_export_import_csv(self):
+        """Тест выгрузки и обратной загрузки заметок в CSV"""
+        Note.objects.create(
+            title='Многострочная', text='Первая, строка\n"Вторая"',
+            author=self.reader
+        )
+        fields = ('title', 'text', 'slug', 'author')
+        expected = list(Note.objects.order_by('id').values_list(*fields))
+        path = self.path / 'notes.csv'
+        call_command('export_notes', path, stdout=StringIO())
+        Note.objects.all().delete()
+        call_command('import_notes', path, stdout=StringIO())
+        self.assertEqual(
+            list(Note.objects.order_by('id').values_list(*fields)),
+            expected
+        )
+
+    def test_generate_notes_data(self):
+        """Тест генерации синтетических заметок"""
+        notes_count = Note.objects.count()
+        users_count = User.objects.count()
+        call_command(
+            'generate_notes_data', users=5, notes=300, batch_size=100,
+            stdout=StringIO()
+        )
+        self.assertEqual(Note.objects.count(), notes_count + 300)
+        self.assertEqual(User.objects.count(), users_count + 5)
+        notes_per_author = list(Note.objects.exclude(
+            author__in=(self.author, self.reader)
+        ).values('author').annotate(
+            count=Count('id')
+        ).order_by('author').values_list('count', flat=True))
+        self.assertGreater(notes_per_author[0], notes_per_author[-1])
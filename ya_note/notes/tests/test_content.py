@@ -1,5 +1,14 @@
+from http import HTTPStatus
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
 from notes.forms import NoteForm
-from .common import CommonTestSetup
+from notes.models import Note
+from notes.profiling import stats
+from .common import CommonTestSetup, User, login_client
 
 
 class TestContent(CommonTestSetup):
@@ -30,3 +39,111 @@ class TestContent(CommonTestSetup):
         response = self.reader_client.get(self.list_url)
         notes = response.context['object_list']
         self.assertNotIn(self.note, notes)
+
+    def test_notes_list_without_text(self):
+        """Тест проверяет, что список заметок не загружает их текст"""
+        with CaptureQueriesContext(connection) as context:
+            self.author_client.get(self.list_url)
+        text_column = '"{}"."text"'.format(Note._meta.db_table)
+        for query in context.captured_queries:
+            with self.subTest(sql=query['sql']):
+                self.assertNotIn(text_column, query['sql'])
+
+    @override_settings(NOTES_COUNT_ON_PAGE=2)
+    def test_notes_list_pages(self):
+        """Тест проверяет постраничный вывод заметок по курсору"""
+        Note.objects.bulk_create(
+            Note(title='Заметка', text='Текст', slug=f'note-{index}',
+                 author=self.author)
+            for index in range(4)
+        )
+        expected = list(Note.objects.filter(
+            author=self.author
+        ).order_by('id').values_list('id', flat=True))
+        ids = []
+        params = {}
+        while True:
+            response = self.author_client.get(self.list_url, params)
+            ids += [note.id for note in response.context['object_list']]
+            if not response.context['next_after']:
+                break
+            params = {'after': response.context['next_after']}
+        self.assertEqual(ids, expected)
+
+    def test_notes_list_bad_after(self):
+        """Тест, что некорректный параметр after - это 404"""
+        for after in ('abc', '-1', '9' * 30):
+            with self.subTest(after=after):
+                response = self.author_client.get(
+                    self.list_url, {'after': after}
+                )
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def search(self, query, **params):
+        return self.author_client.get(
+            reverse('notes:search'), {'q': query, **params}
+        )
+
+    def test_search_ranked_for_author(self):
+        """Тест поиска: свои заметки со всеми словами, по убыванию веса"""
+        in_title = Note.objects.create(
+            title='Рецепт борща', text='Свёкла и капуста', author=self.author
+        )
+        in_text = Note.objects.create(
+            title='Обед', text='Рецепт борща от бабушки', author=self.author
+        )
+        Note.objects.create(title='Рецепт', text='Пирог', author=self.author)
+        Note.objects.create(
+            title='Рецепт борща', text='Чужой', author=self.reader
+        )
+        searches = (
+            ('рецепт БОРЩА', [in_title, in_text]),
+            ('свекла', [in_title]),
+            ('', []),
+            ('!!!', []),
+        )
+        for query, expected in searches:
+            with self.subTest(query=query):
+                response = self.search(query)
+                self.assertEqual(
+                    list(response.context['object_list']), expected
+                )
+
+    @override_settings(NOTES_SEARCH_COUNT_ON_PAGE=2)
+    def test_search_pages(self):
+        """Тест постраничного вывода результатов поиска"""
+        for _ in range(4):
+            Note.objects.create(
+                title='Заметка', text='Текст', author=self.author
+            )
+        expected = list(Note.objects.filter(
+            author=self.author
+        ).order_by('-id').values_list('id', flat=True))
+        ids = []
+        params = {}
+        while True:
+            response = self.search('текст', **params)
+            ids += [note.id for note in response.context['object_list']]
+            if not response.context['next_cursor']:
+                break
+            params['cursor'] = response.context['next_cursor']
+        self.assertEqual(ids, expected)
+
+    def test_search_bad_cursor(self):
+        """Тест, что некорректный курсор поиска - это 404"""
+        for cursor in ('abc', '-1', '1-2-3', f'{"9" * 30}-1'):
+            with self.subTest(cursor=cursor):
+                response = self.search('текст', cursor=cursor)
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    @override_settings(PROFILING_ENABLED=True)
+    def test_profiling(self):
+        """Тест замеров страниц и их сводки для персонала"""
+        stats.clear()
+        response = login_client(self.author).get(self.list_url)
+        self.assertIn('sql;dur=', response['Server-Timing'])
+        self.assertIn('template;dur=', response['Server-Timing'])
+        staff = User.objects.create(username='Персонал', is_staff=True)
+        summary = login_client(staff).get(reverse('notes:profiling')).json()
+        self.assertEqual(summary['notes:list']['count'], 1)
+        self.assertEqual(summary['notes:list']['queries']['p50'], 3)
@@ -1,10 +1,20 @@
+import runpy
 from http import HTTPStatus
+from unittest.mock import patch
 
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 from pytils.translit import slugify
 
 from notes.forms import WARNING
-from notes.models import Note
-from .common import CommonTestSetup
+from notes.models import Note, NoteTerm
+from notes.utils import slugify_cache_stats
+from yanote import settings as project_settings
+from .common import CommonTestSetup, login_client
 
 
 class TestNoteCreation(CommonTestSetup):
@@ -97,6 +107,17 @@ class TestNoteCreation(CommonTestSetup):
         note_count = Note.objects.count()
         self.assertEqual(notes_count, note_count)
 
+    def test_search_index_follows_edits(self):
+        """Тест, что поиск видит правку заметки и не видит удалённую"""
+        self.author_client.post(self.edit_url, data=self.new_form_data)
+        found = Note.search(self.author, 'новый')
+        self.assertEqual([row[0] for row in found], [self.note.id])
+        self.assertFalse(Note.search(self.author, 'заголовок текст').exists())
+        self.author_client.post(
+            reverse('notes:delete', args=(self.new_form_data['slug'],))
+        )
+        self.assertFalse(NoteTerm.objects.exists())
+
     def test_auth_can_delete(self):
         """Тестирует, что автор заметки может ее удалить"""
         notes_count = Note.objects.count()
@@ -151,3 +172,104 @@ class TestNoteCreation(CommonTestSetup):
             errors=(self.note.slug + WARNING)
         )
         self.assertEqual(Note.objects.count(), notes_count)
+
+    def test_empty_slug_same_title(self):
+        """Тестирует суффиксы slug у заметок с одинаковым заголовком"""
+        self.form_data.pop('slug')
+        slug_ex = slugify(self.form_data['title'])
+        for client, expected_slug in (
+            (self.author_client, slug_ex),
+            (self.reader_client, f'{slug_ex}-2'),
+            (self.author_client, f'{slug_ex}-3'),
+        ):
+            with self.subTest(slug=expected_slug):
+                response = client.post(self.add_url, data=self.form_data)
+                self.assertRedirects(response, self.success_url)
+                new_note = Note.objects.latest('id')
+                self.assertEqual(new_note.slug, expected_slug)
+
+    def test_free_slug_single_query(self):
+        """Тестирует, что свободный slug ищется одним запросом"""
+        for _ in range(3):
+            Note.objects.create(title=self.note.title, author=self.author)
+        note = Note(title=self.note.title, author=self.reader)
+        with self.assertNumQueries(1):
+            slug = note.get_free_slug()
+        self.assertEqual(slug, f'{self.note.slug}-5')
+
+    def test_long_title_slug(self):
+        """Тестирует, что slug с суффиксом не длиннее поля"""
+        title = 'з' * 100
+        max_length = Note._meta.get_field('slug').max_length
+        first = Note.objects.create(title=title, author=self.author)
+        second = Note.objects.create(title=title, author=self.reader)
+        self.assertEqual(len(first.slug), max_length)
+        self.assertLessEqual(len(second.slug), max_length)
+        self.assertTrue(second.slug.endswith('-2'))
+
+    def test_slug_taken_by_concurrent_save(self):
+        """Тестирует повторный выбор slug, если его успели занять"""
+        with patch.object(
+            Note,
+            'get_free_slug',
+            side_effect=(self.note.slug, 'free-slug')
+        ):
+            note = Note.objects.create(
+                title=self.note.title, author=self.reader
+            )
+        self.assertEqual(note.slug, 'free-slug')
+
+    def test_slugify_cached(self):
+        """Тестирует, что повторная транслитерация берётся из кэша"""
+        hits = slugify_cache_stats()['hits']
+        for _ in range(2):
+            Note.objects.create(title='Новый заголовок', author=self.author)
+        self.assertGreater(slugify_cache_stats()['hits'], hits)
+
+
+class TestSessionModes(CommonTestSetup):
+    # Запросов к таблице сессий на страницу вошедшего пользователя.
+    SESSION_QUERIES = {'db': 1, 'cached_db': 0, 'signed_cookies': 0}
+    PASSWORD = 'password'
+
+    def log_in(self):
+        # Смена пароля сбрасывает прежние сессии, вход после неё.
+        self.author.set_password(self.PASSWORD)
+        self.author.save()
+        client = Client()
+        response = client.post(reverse('users:login'), {
+            'username': self.author.username, 'password': self.PASSWORD
+        })
+        self.assertRedirects(response, settings.LOGIN_REDIRECT_URL)
+        return client
+
+    def test_session_modes(self):
+        """Вход, страницы и выход с каждым хранилищем сессий"""
+        for mode, engine in settings.SESSION_ENGINES.items():
+            for make_client in (lambda: login_client(self.author),
+                                self.log_in):
+                with self.subTest(mode=mode), override_settings(
+                    SESSION_ENGINE=engine
+                ):
+                    client = make_client()
+                    client.get(self.list_url)
+                    with CaptureQueriesContext(connection) as context:
+                        response = client.get(self.list_url)
+                    self.assertEqual(response.context['user'], self.author)
+                    self.assertEqual(sum(
+                        'django_session' in query['sql']
+                        for query in context.captured_queries
+                    ), self.SESSION_QUERIES[mode])
+                    client.post(reverse('users:logout'))
+                    self.assertRedirects(
+                        client.get(self.list_url),
+                        f'{reverse("users:login")}?next={self.list_url}'
+                    )
+
+    def test_unknown_session_mode(self):
+        """Неизвестный режим сессий останавливает запуск"""
+        with patch.dict('os.environ', SESSION_MODE='redis'):
+            with self.assertRaisesRegex(
+                ImproperlyConfigured, 'signed_cookies'
+            ):
+                runpy.run_path(project_settings.__file__)
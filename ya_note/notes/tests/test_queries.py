@@ -0,0 +1,46 @@
+from django.db import connection
+from django.urls import reverse
+
+from notes.models import Note
+from .common import CommonTestSetup
+
+
+class TestQueries(CommonTestSetup):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Note.objects.bulk_create(
+            Note(title='Заметка', text='Текст',
+                 slug=f'note-{author.id}-{index}', author=author)
+            for author in (cls.author, cls.reader)
+            for index in range(50)
+        )
+        cls.detail_url = reverse('notes:detail', args=(cls.note.slug,))
+
+    def test_hot_views_use_indexes(self):
+        """Проверяет, что запросы страниц заметок идут по индексам"""
+        urls = (
+            (self.list_url, {}),
+            (self.list_url, {'after': self.note.id}),
+            (self.detail_url, {}),
+            (self.edit_url, {}),
+            (self.delete_url, {}),
+        )
+        for url, params in urls:
+            with self.subTest(url=url, params=params):
+                with self.assert_uses_indexes():
+                    self.author_client.get(url, params)
+
+    def test_search_reads_only_term_index(self):
+        """Проверяет, что ранжирование поиска читает только индекс слов"""
+        sql, params = Note.search(
+            self.author, 'заметка текст'
+        ).query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = [row[-1] for row in cursor.fetchall()]
+        self.assertTrue(
+            any('USING COVERING INDEX note_term_idx' in step for step in plan),
+            '\n'.join(plan)
+        )
@@ -23,6 +23,7 @@ class TestRoutes(CommonTestSetup):
         cls.urls_for_author = (
             reverse('notes:add'),
             reverse('notes:list'),
+            reverse('notes:search'),
             reverse('notes:success'),
         )
         cls.urls_only_for_author = (
@@ -31,6 +32,7 @@ class TestRoutes(CommonTestSetup):
             reverse('notes:delete', args=(cls.note.slug,)),
         )
         cls.login_url = reverse('users:login')
+        cls.profiling_url = reverse('notes:profiling')
 
     def test_pages_availability(self):
         """Проверка страниц доступных для ананимного пользователя"""
@@ -49,6 +51,8 @@ class TestRoutes(CommonTestSetup):
             (self.reader_client,
              self.urls_for_author,
              HTTPStatus.FOUND),
+            (self.client, (self.profiling_url,), HTTPStatus.FOUND),
+            (self.author_client, (self.profiling_url,), HTTPStatus.FORBIDDEN),
         )
         for client, urls, expected_status in urls_and_users:
             for url in urls:
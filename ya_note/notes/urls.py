@@ -1,15 +1,49 @@
 from django.urls import path
 
-from notes import views
+from notes import profiling, views
+from notes.budgets import budget
 
 app_name = 'notes'
 
 urlpatterns = [
-    path('', views.Home.as_view(), name='home'),
-    path('add/', views.NoteCreate.as_view(), name='add'),
-    path('edit/<slug:slug>/', views.NoteUpdate.as_view(), name='edit'),
-    path('note/<slug:slug>/', views.NoteDetail.as_view(), name='detail'),
-    path('delete/<slug:slug>/', views.NoteDelete.as_view(), name='delete'),
-    path('notes/', views.NotesList.as_view(), name='list'),
-    path('done/', views.NoteSuccess.as_view(), name='success'),
+    budget(
+        path('', views.Home.as_view(), name='home'),
+        queries=2, ms=100
+    ),
+    budget(
+        path('add/', views.NoteCreate.as_view(), name='add'),
+        queries=2, ms=100
+    ),
+    budget(
+        path('edit/<slug:slug>/', views.NoteUpdate.as_view(), name='edit'),
+        queries=3, ms=200
+    ),
+    budget(
+        path('note/<slug:slug>/', views.NoteDetail.as_view(), name='detail'),
+        queries=3, ms=200
+    ),
+    budget(
+        path('delete/<slug:slug>/', views.NoteDelete.as_view(), name='delete'),
+        queries=3, ms=200
+    ),
+    budget(
+        path('notes/', views.NotesList.as_view(), name='list'),
+        queries=3, ms=200
+    ),
+    budget(
+        path('search/', views.NoteSearch.as_view(), name='search'),
+        queries=4, ms=200
+    ),
+    budget(
+        path('done/', views.NoteSuccess.as_view(), name='success'),
+        queries=2, ms=100
+    ),
+    budget(
+        path(
+            'profiling/',
+            profiling.ProfilingStats.as_view(),
+            name='profiling'
+        ),
+        queries=2, ms=50
+    ),
 ]
@@ -0,0 +1,47 @@
+import re
+from collections import Counter
+from functools import lru_cache
+
+from pytils.translit import slugify as translit_slugify
+
+SLUGIFY_CACHE_SIZE = 4096
+TERM = re.compile(r'\w+')
+TERM_MAX_LENGTH = 50
+# Слово из заголовка весит как столько же слов из текста.
+TITLE_TERM_WEIGHT = 3
+
+
+@lru_cache(maxsize=SLUGIFY_CACHE_SIZE)
+def slugify(text):
+    """Транслитерация pytils с кэшем последних заголовков."""
+    return translit_slugify(text)
+
+
+def slugify_cache_stats():
+    """Статистика кэша транслитерации."""
+    info = slugify.cache_info()
+    calls = info.hits + info.misses
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'size': info.currsize,
+        'max_size': info.maxsize,
+        'hit_rate': info.hits / calls if calls else 0.0,
+    }
+
+
+def get_terms(text):
+    """Слова текста для поиска: в нижнем регистре, «ё» как «е»."""
+    return [
+        term[:TERM_MAX_LENGTH]
+        for term in TERM.findall(text.lower().replace('ё', 'е'))
+        if len(term) > 1
+    ]
+
+
+def get_term_weights(text, title=''):
+    """Вес каждого слова заметки: число вхождений, в заголовке больше."""
+    weights = Counter(get_terms(text))
+    for term in get_terms(title):
+        weights[term] += TITLE_TERM_WEIGHT
+    return weights
@@ -1,10 +1,20 @@
+import re
+
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db.models import Q
+from django.http import Http404
 from django.urls import reverse_lazy
 from django.views import generic
 
 from .forms import NoteForm
 from .models import Note
 
+# Id в параметрах запроса, не больше 18 цифр: помещается в INTEGER SQLite.
+ID_PARAM = re.compile(r'\d{1,18}')
+# Курсор поиска «вес-id», обе части тоже помещаются в INTEGER SQLite.
+SEARCH_CURSOR = re.compile(r'(\d{1,18})-(\d{1,18})')
+
 
 class Home(generic.TemplateView):
     """Домашняя страница."""
@@ -53,6 +63,82 @@ class NotesList(NoteBase, generic.ListView):
     """Список всех заметок пользователя."""
     template_name = 'notes/list.html'
 
+    def get_queryset(self):
+        """
+        Заметки с id больше параметра after, по возрастанию id.
+
+        Загружаются только поля, которые выводит шаблон списка.
+        """
+        queryset = super().get_queryset().only(
+            'id', 'slug', 'title'
+        ).order_by('id')
+        after = self.request.GET.get('after')
+        if after:
+            if not ID_PARAM.fullmatch(after):
+                raise Http404('Некорректный параметр after.')
+            queryset = queryset.filter(id__gt=int(after))
+        return queryset
+
+    def get_context_data(self, **kwargs):
+        per_page = settings.NOTES_COUNT_ON_PAGE
+        notes = list(self.object_list[:per_page + 1])
+        context = super().get_context_data(
+            object_list=notes[:per_page], **kwargs
+        )
+        context['next_after'] = (
+            notes[per_page - 1].pk if len(notes) > per_page else None
+        )
+        return context
+
+
+class NoteSearch(NoteBase, generic.ListView):
+    """Поиск по заметкам пользователя."""
+    template_name = 'notes/search.html'
+
+    def get_queryset(self):
+        """
+        Id и вес найденных заметок после курсора, см. Note.search.
+
+        Курсор «вес-id» последней показанной заметки попадает в HAVING:
+        страница не пропускает строки через OFFSET.
+        """
+        ranking = self.model.search(
+            self.request.user, self.request.GET.get('q', '')
+        )
+        cursor = self.request.GET.get('cursor')
+        if cursor:
+            match = SEARCH_CURSOR.fullmatch(cursor)
+            if match is None:
+                raise Http404('Некорректный курсор.')
+            score, note_id = map(int, match.groups())
+            ranking = ranking.filter(
+                Q(score__lt=score) | Q(score=score, note__lt=note_id)
+            )
+        return ranking
+
+    def get_context_data(self, **kwargs):
+        """
+        Страница результатов по NOTES_SEARCH_COUNT_ON_PAGE.
+
+        Заметки страницы загружаются одним запросом только с полями,
+        которые выводит шаблон.
+        """
+        per_page = settings.NOTES_SEARCH_COUNT_ON_PAGE
+        ranking = list(self.object_list[:per_page + 1])
+        note_ids = [note_id for note_id, _, _ in ranking[:per_page]]
+        notes = self.model.objects.only(
+            'id', 'slug', 'title'
+        ).in_bulk(note_ids)
+        context = super().get_context_data(
+            object_list=[notes[note_id] for note_id in note_ids], **kwargs
+        )
+        context['query'] = self.request.GET.get('q', '')
+        context['next_cursor'] = None
+        if len(ranking) > per_page:
+            note_id, score, _ = ranking[per_page - 1]
+            context['next_cursor'] = f'{score}-{note_id}'
+        return context
+
 
 class NoteDetail(NoteBase, generic.DetailView):
     """Заметка подробно."""
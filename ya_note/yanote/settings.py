@@ -1,5 +1,7 @@
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
 from django.urls import reverse_lazy
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -22,6 +24,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'notes.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -59,6 +62,25 @@ DATABASES = {
     }
 }
 
+# Сессии YaNote, режим задаёт переменная окружения SESSION_MODE: 'db'
+# по умолчанию, 'cached_db' - кэш с записью в базу, 'signed_cookies' -
+# подписанная cookie без обращений к базе, её содержимое видно
+# пользователю. CACHES не задан, и 'cached_db' держит сессии в памяти
+# процесса: при нескольких процессах выход в одном не завершит сессию
+# в остальных, для них нужен общий кэш в CACHES.
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_MODE = os.environ.get('SESSION_MODE', 'db')
+if SESSION_MODE not in SESSION_ENGINES:
+    raise ImproperlyConfigured(
+        f'Неизвестный SESSION_MODE {SESSION_MODE!r}, '
+        f'допустимы: {", ".join(SESSION_ENGINES)}.'
+    )
+SESSION_ENGINE = SESSION_ENGINES[SESSION_MODE]
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -87,3 +109,11 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+NOTES_COUNT_ON_PAGE = 100
+NOTES_SEARCH_COUNT_ON_PAGE = 20
+
+# Замеры времени страниц: заголовок Server-Timing и процентили
+# последних PROFILING_WINDOW запросов на notes:profiling.
+PROFILING_ENABLED = False
+PROFILING_WINDOW = 1000